@@ -1,39 +1,245 @@
+import asyncio
+import hashlib
 import logging
-from typing import Generator, Optional
+import time
+from typing import Any, Dict, Generator, Optional, Tuple
 
-from fastapi import Depends, HTTPException, status
+import httpx
+from cachetools import TTLCache
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from supabase import Client
 from gotrue.errors import AuthApiError  # Specific Supabase auth errors
-from jose import JWTError, jwt  # If you were decoding manually (less needed now)
+from jose import ExpiredSignatureError, JWTError, jwk, jwt
+from jose.backends.base import Key
 
 from app.db.session import get_db
 from app.core.config import settings
 from app.schemas import user as user_schema
 from app.schemas import token as token_schema
+from app.services.lead_transfer_queue import LeadTransferQueue
+from app.services.pineapple_api import PineappleAPIService
 
 logger = logging.getLogger(__name__)
 
 # OAuth2 scheme pointing to your login endpoint
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# Short-lived cache of validated tokens, keyed by a SHA-256 digest of the token.
+# Entries store (monotonic deadline, user) so a token is never served past its `exp`.
+TOKEN_CACHE_TTL_SECONDS = 60
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL_SECONDS)
+# Per-token validation lock and the number of requests holding or waiting on it; the
+# entry is dropped once the last of them is done
+_token_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+
+def _token_cache_key(token: str) -> str:
+    """Returns the cache key for a bearer token (never store the raw token)."""
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def _token_cache_deadline(token: str, exp: Optional[float] = None) -> float:
+    """
+    Returns the monotonic time until which a validated token may be cached.
+    `exp` is passed when already known from verification, saving a second decode.
+    """
+    ttl = float(TOKEN_CACHE_TTL_SECONDS)
+    try:
+        if exp is None:
+            exp = jwt.get_unverified_claims(token).get("exp")
+        if exp is not None:
+            ttl = min(ttl, float(exp) - time.time())
+    except (JWTError, TypeError, ValueError):
+        pass  # Not a decodable JWT; fall back to the default TTL
+    return time.monotonic() + ttl
+
+
+# Supabase publishes its asymmetric signing keys as a JWKS document. Keys are fetched
+# once and reused, so tokens signed with them are verified locally without a network hop.
+SUPABASE_JWKS_URL = f"{settings.SUPABASE_URL}/auth/v1/.well-known/jwks.json"
+JWKS_CACHE_LIFESPAN_SECONDS = 3600
+JWKS_MIN_REFRESH_INTERVAL_SECONDS = 60  # Bounds refetches triggered by unknown `kid`s
+JWT_ALGORITHMS = ["RS256", "ES256"]
+JWT_AUDIENCE = "authenticated"
+_JWT_DECODE_OPTIONS = {"require_exp": True, "require_sub": True}
+# Legacy projects sign with a shared HS256 secret. With the secret configured those
+# tokens are checked with a local HMAC instead of a Supabase Auth round-trip.
+_HS256_KEY: Optional[Key] = (
+    jwk.construct(settings.SUPABASE_JWT_SECRET, "HS256")
+    if settings.SUPABASE_JWT_SECRET
+    else None
+)
+# Each key object is bound to one algorithm, so accepting HS256 here cannot be
+# used to verify a token against a JWKS public key as an HMAC secret
+_JWT_DECODE_ALGORITHMS = JWT_ALGORITHMS + ["HS256"]
+_jwks_keys: Dict[str, Key] = {}  # Parsed once per fetch, not per verification
+_jwks_fetched_at: float = 0.0
+_jwks_lock = asyncio.Lock()
+
+
+async def _refresh_jwks() -> None:
+    """Fetches the Supabase JWKS document and replaces the cached keys."""
+    global _jwks_keys, _jwks_fetched_at
+    _jwks_fetched_at = time.monotonic()
+    try:
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.get(SUPABASE_JWKS_URL)
+            response.raise_for_status()
+            keys = response.json().get("keys", [])
+        _jwks_keys = {key["kid"]: _construct_key(key) for key in keys if key.get("kid")}
+        logger.info(f"Loaded {len(_jwks_keys)} signing key(s) from Supabase JWKS.")
+    except Exception as e:
+        logger.warning(f"Could not fetch Supabase JWKS from {SUPABASE_JWKS_URL}: {e}")
+
+
+def _construct_key(key: Dict[str, Any]) -> Key:
+    """Builds the verification key object for a JWK (RSA or EC public numbers)."""
+    alg = key.get("alg") or ("ES256" if key.get("kty") == "EC" else "RS256")
+    return jwk.construct(key, alg)
+
+
+async def warm_jwks_cache() -> None:
+    """Loads the JWKS at startup so the first authenticated request skips the fetch."""
+    async with _jwks_lock:
+        await _refresh_jwks()
+
+
+async def _get_signing_key(token: str) -> Optional[Key]:
+    """
+    Returns the key to verify the token with locally: the cached JWKS key matching
+    its `kid`, or the HS256 secret key. None means only Supabase can verify it.
+    """
+    header = jwt.get_unverified_header(token)
+    alg = header.get("alg")
+    if alg == "HS256":
+        return _HS256_KEY
+    kid = header.get("kid")
+    if not kid or alg not in JWT_ALGORITHMS:
+        return None
+
+    key = _jwks_keys.get(kid)
+    if key is not None and (
+        time.monotonic() - _jwks_fetched_at < JWKS_CACHE_LIFESPAN_SECONDS
+    ):
+        return key
+
+    async with _jwks_lock:
+        age = time.monotonic() - _jwks_fetched_at
+        stale = age >= JWKS_CACHE_LIFESPAN_SECONDS
+        if stale or (
+            kid not in _jwks_keys and age >= JWKS_MIN_REFRESH_INTERVAL_SECONDS
+        ):
+            await _refresh_jwks()
+    return _jwks_keys.get(kid)
+
+
+def _validate_token_locally(token: str, key: Key) -> Tuple[user_schema.User, float]:
+    """Verifies the token signature and claims; returns the mapped User and `exp`."""
+    payload = jwt.decode(
+        token,
+        key,
+        algorithms=_JWT_DECODE_ALGORITHMS,
+        audience=JWT_AUDIENCE,
+        options=_JWT_DECODE_OPTIONS,
+    )
+    user = user_schema.User.model_validate(
+        {
+            "id": payload["sub"],
+            "email": payload.get("email") or None,
+            "aud": payload.get("aud"),
+            "role": payload.get("role"),
+            "app_metadata": payload.get("app_metadata") or {},
+            "user_metadata": payload.get("user_metadata") or {},
+        }
+    )
+    return user, float(payload["exp"])
+
+
+def _get_cached_user(key: str) -> Optional[user_schema.User]:
+    entry: Optional[Tuple[float, user_schema.User]] = _token_cache.get(key)
+    if entry is None:
+        return None
+    deadline, user = entry
+    if time.monotonic() >= deadline:
+        _token_cache.pop(key, None)
+        return None
+    return user
+
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme), db: Client = Depends(get_db)
 ) -> user_schema.User:
     """
-    Validates JWT token using Supabase and returns the user data.
+    Validates the JWT and returns the user data.
+    Tokens signed with a Supabase JWKS key are verified locally; others fall back to Supabase.
+    Validated tokens are cached briefly so repeat requests skip validation entirely.
     Handles authentication errors.
     """
-    credentials_exception = HTTPException(
+    cache_key = _token_cache_key(token)
+    user = _get_cached_user(cache_key)
+    if user is not None:
+        return user
+
+    # One validation per token; concurrent first hits wait for its result
+    lock, waiters = _token_locks.get(cache_key, (asyncio.Lock(), 0))
+    _token_locks[cache_key] = (lock, waiters + 1)
+    try:
+        async with lock:
+            user = _get_cached_user(cache_key)
+            if user is None:
+                user, exp = await _validate_token(token, db)
+                deadline = _token_cache_deadline(token, exp)
+                if deadline > time.monotonic():
+                    _token_cache[cache_key] = (deadline, user)
+            return user
+    finally:
+        lock, waiters = _token_locks[cache_key]
+        if waiters <= 1:
+            del _token_locks[cache_key]
+        else:
+            _token_locks[cache_key] = (lock, waiters - 1)
+
+
+async def _validate_token(
+    token: str, db: Client
+) -> Tuple[user_schema.User, Optional[float]]:
+    """
+    Validates the token locally when possible, otherwise via Supabase Auth.
+    Returns the user and the token's `exp` when it was read during verification.
+    """
+    try:
+        signing_key = await _get_signing_key(token)
+        if signing_key is None:
+            return await _validate_token_with_supabase(token, db), None
+        user, exp = _validate_token_locally(token, signing_key)
+        logger.debug(f"User {user.id} authenticated via local JWT verification.")
+        return user, exp
+    except ExpiredSignatureError as e:
+        logger.info("Rejected expired access token.")
+        raise _credentials_exception() from e
+    except JWTError as e:
+        logger.warning(f"JWT validation failed: {e}")
+        raise _credentials_exception() from e
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+async def _validate_token_with_supabase(token: str, db: Client) -> user_schema.User:
+    """Validates the token against Supabase Auth and maps the result to a User."""
+    credentials_exception = _credentials_exception()
     try:
         logger.debug("Attempting to validate token and get user from Supabase.")
         # Use Supabase client to validate the token and fetch user
-        user_response = db.auth.get_user(token)
+        # supabase-py is synchronous; keep the round-trip off the event loop
+        user_response = await asyncio.to_thread(db.auth.get_user, token)
 
         if not user_response or not user_response.user:
             logger.warning(
@@ -76,5 +282,20 @@ async def get_current_user(
         raise credentials_exception from e
 
 
+def get_pineapple_client(request: Request) -> httpx.AsyncClient:
+    """Returns the shared Pineapple HTTP client created in the app lifespan."""
+    return request.app.state.pineapple_client
+
+
+def get_pineapple_service(request: Request) -> PineappleAPIService:
+    """Returns the PineappleAPIService singleton created in the app lifespan."""
+    return request.app.state.pineapple_service
+
+
+def get_lead_transfer_queue(request: Request) -> LeadTransferQueue:
+    """Returns the background lead transfer queue created in the app lifespan."""
+    return request.app.state.lead_transfer_queue
+
+
 # Optional: Dependency for checking specific roles if using Supabase roles/claims
 # async def require_role(required_role: str, current_user: user_schema.User = Depends(get_current_user)): ...
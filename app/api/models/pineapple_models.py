@@ -5,7 +5,7 @@ from typing import List, Optional, Dict, Any, Union, Literal
 class LeadTransferRequest(BaseModel):
     """Model for lead transfer request to Pineapple API."""
 
-    model_config = ConfigDict(extra="allow")  # Added to allow extra fields
+    model_config = ConfigDict(extra="ignore", frozen=True)
 
     source: str = Field(default="SureStrat", description="Lead source or campaign name")
     first_name: str = Field(..., description="Lead's first name")
@@ -21,7 +21,7 @@ class LeadTransferRequest(BaseModel):
 class LeadTransferData(BaseModel):
     """Model for lead transfer response data."""
 
-    model_config = ConfigDict(extra="allow")
+    model_config = ConfigDict(extra="ignore", frozen=True)
 
     uuid: str
     redirect_url: Optional[str] = None
@@ -30,7 +30,7 @@ class LeadTransferData(BaseModel):
 class LeadTransferResponse(BaseModel):
     """Model for lead transfer response from Pineapple API."""
 
-    model_config = ConfigDict(extra="allow")  # Added to allow extra fields
+    model_config = ConfigDict(extra="ignore", frozen=True)
 
     success: bool
     data: Optional[LeadTransferData] = None
@@ -40,7 +40,7 @@ class LeadTransferResponse(BaseModel):
 class Address(BaseModel):
     """Vehicle address model."""
 
-    model_config = ConfigDict(extra="allow")  # Added to allow extra fields
+    model_config = ConfigDict(extra="ignore", frozen=True)
 
     addressLine: str
     postalCode: int
@@ -52,7 +52,7 @@ class Address(BaseModel):
 class RegularDriver(BaseModel):
     """Regular driver information model."""
 
-    model_config = ConfigDict(extra="allow")  # Added to allow extra fields
+    model_config = ConfigDict(extra="ignore", frozen=True)
 
     maritalStatus: str = Field(..., description="Marital status of the driver")
     currentlyInsured: bool
@@ -69,7 +69,7 @@ class RegularDriver(BaseModel):
 class Vehicle(BaseModel):
     """Vehicle information model for quick quote."""
 
-    model_config = ConfigDict(extra="allow")  # Added to allow extra fields
+    model_config = ConfigDict(extra="ignore", frozen=True)
 
     year: int
     make: str
@@ -98,7 +98,7 @@ class Vehicle(BaseModel):
 class QuickQuoteRequest(BaseModel):
     """Model for quick quote request to Pineapple API."""
 
-    model_config = ConfigDict(extra="allow")  # Added to allow extra fields
+    model_config = ConfigDict(extra="ignore", frozen=True)
 
     source: str = Field(default="SureStrat")
     externalReferenceId: str
@@ -108,7 +108,7 @@ class QuickQuoteRequest(BaseModel):
 class QuoteResult(BaseModel):
     """Model for individual quote result."""
 
-    model_config = ConfigDict(extra="allow")  # Added to allow extra fields
+    model_config = ConfigDict(extra="ignore", frozen=True)
 
     premium: float
     excess: float  # Changed from int to float for compatibility
@@ -117,7 +117,7 @@ class QuoteResult(BaseModel):
 class QuickQuoteResponse(BaseModel):
     """Model for quick quote response from Pineapple API."""
 
-    model_config = ConfigDict(extra="allow")  # Added to allow extra fields
+    model_config = ConfigDict(extra="ignore", frozen=True)
 
     success: bool
     id: Optional[str] = None
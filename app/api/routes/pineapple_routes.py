@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Request, status
 from ..models.pineapple_models import (
     LeadTransferRequest,
     LeadTransferResponse,
     QuickQuoteRequest,
     QuickQuoteResponse,
 )
+from app.api import deps
+from app.core.config import settings
+from app.core.rate_limiter import limiter
 from app.services.pineapple_api import PineappleAPIService
 import logging
 
@@ -17,27 +20,21 @@ router = APIRouter(tags=["pineapple"])
 )
 async def submit_quick_quote(
     quote_request: QuickQuoteRequest,
-    pineapple_service: PineappleAPIService = Depends(lambda: PineappleAPIService()),
+    pineapple_service: PineappleAPIService = Depends(deps.get_pineapple_service),
 ):
     """
     Submit a vehicle insurance quick quote request to get premium estimate.
 
     This endpoint forwards the request to Pineapple's API and returns premium and excess information.
     """
-    try:
-        # Fixed: Use model_dump() instead of dict()
-        request_data = quote_request.model_dump()
-        logger.debug(f"Processing quick quote request: {request_data}")
+    # Pineapple/transport failures are mapped to 502 by the app-level exception handler
+    if logger.isEnabledFor(logging.DEBUG):  # Skip formatting payloads otherwise
+        logger.debug(f"Processing quick quote request: {quote_request}")
 
-        response = pineapple_service.submit_quick_quote(request_data)
+    response = await pineapple_service.submit_quick_quote(quote_request)
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug(f"Received quick quote response: {response}")
-        return response
-    except Exception as e:
-        logger.error(f"Error processing quick quote: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get insurance quote: {str(e)}",
-        )
+    return response
 
 
 @router.post(
@@ -45,25 +42,21 @@ async def submit_quick_quote(
     response_model=LeadTransferResponse,
     status_code=status.HTTP_200_OK,
 )
+@limiter.limit(settings.LEAD_TRANSFER_RATE_LIMIT)
 async def transfer_lead(
+    request: Request,
     lead_request: LeadTransferRequest,
-    pineapple_service: PineappleAPIService = Depends(lambda: PineappleAPIService()),
+    pineapple_service: PineappleAPIService = Depends(deps.get_pineapple_service),
 ):
     """
     Transfer a lead to Pineapple's system.
 
     This endpoint forwards lead information to Pineapple and returns a success status and redirect URL.
     """
-    try:
-        request_data = lead_request.model_dump()
-        logger.debug(f"Processing lead transfer request: {request_data}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Processing lead transfer request: {lead_request}")
 
-        response = pineapple_service.transfer_lead(request_data)
+    response = await pineapple_service.transfer_lead(lead_request)
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug(f"Received lead transfer response: {response}")
-        return response
-    except Exception as e:
-        logger.error(f"Error transferring lead: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to transfer lead: {str(e)}",
-        )
+    return response
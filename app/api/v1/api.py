@@ -1,6 +1,14 @@
-from fastapi import APIRouter
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import APIRouter, Response, status
 
 from app.api.v1.endpoints import auth, quotes, leads
+from app.db.session import get_supabase_client
+
+logger = logging.getLogger(__name__)
 
 api_router = APIRouter()
 
@@ -11,7 +19,79 @@ api_router.include_router(quotes.router, prefix="/quotes", tags=["quotes"])
 api_router.include_router(leads.router, prefix="/leads", tags=["leads"])
 
 
-# Example: Add a simple health check within the v1 prefix
+HEALTH_CHECK_TIMEOUT_SECONDS = 1.0  # Upper bound for each subsystem probe
+HEALTH_CACHE_TTL_SECONDS = 5.0  # Probes within this window reuse the last result
+_last_health: Tuple[float, int, Dict[str, Any]] = (0.0, status.HTTP_200_OK, {})
+# Refresh shared by requests arriving while the cached result is being recomputed
+_health_refresh: Optional["asyncio.Task[Tuple[int, Dict[str, Any]]]"] = None
+# A probe that timed out keeps running in its worker thread, so later checks wait on
+# it again instead of stacking up new threads behind a stuck connection
+_database_probe: Optional[asyncio.Future] = None
+
+
+def _probe_database() -> None:
+    """Runs a minimal query against Supabase (blocking; called in a worker thread)."""
+    get_supabase_client().table("users").select("id").limit(1).execute()
+
+
+async def _check_database() -> None:
+    global _database_probe
+    if _database_probe is None or _database_probe.done():
+        _database_probe = asyncio.ensure_future(asyncio.to_thread(_probe_database))
+        # Outcome may arrive after every waiter timed out; retrieve it so it isn't reported
+        _database_probe.add_done_callback(
+            lambda probe: probe.cancelled() or probe.exception()
+        )
+    await asyncio.wait_for(
+        asyncio.shield(_database_probe), timeout=HEALTH_CHECK_TIMEOUT_SECONDS
+    )
+
+
+# Each check is a coroutine factory; all checks run concurrently with bounded latency
+_HEALTH_CHECKS = {
+    "database": _check_database,
+}
+
+
+async def _run_health_checks() -> Tuple[int, Dict[str, Any]]:
+    global _last_health
+    results = await asyncio.gather(
+        *(check() for check in _HEALTH_CHECKS.values()), return_exceptions=True
+    )
+    checks = []
+    for name, result in zip(_HEALTH_CHECKS, results):
+        if isinstance(result, BaseException):
+            # Error details stay in the logs; the public endpoint only says what kind
+            if isinstance(result, asyncio.TimeoutError):
+                reason = "timeout"
+                logger.warning(f"Health check '{name}' timed out")
+            else:
+                reason = "unavailable"
+                logger.warning(
+                    f"Health check '{name}' failed: {result!r}", exc_info=result
+                )
+            checks.append({"name": name, "status": "fail", "output": reason})
+        else:
+            checks.append({"name": name, "status": "pass"})
+
+    healthy = all(check["status"] == "pass" for check in checks)
+    status_code = status.HTTP_200_OK if healthy else status.HTTP_503_SERVICE_UNAVAILABLE
+    payload = {
+        "status": "ok" if healthy else "degraded",
+        "version": "v1",
+        "checks": checks,
+    }
+    _last_health = (time.monotonic(), status_code, payload)
+    return status_code, payload
+
+
 @api_router.get("/health", status_code=200, tags=["Health"])
-async def health_check():
-    return {"status": "ok", "version": "v1"}
+async def health_check(response: Response):
+    global _health_refresh
+    checked_at, status_code, payload = _last_health
+    if time.monotonic() - checked_at >= HEALTH_CACHE_TTL_SECONDS:
+        if _health_refresh is None or _health_refresh.done():
+            _health_refresh = asyncio.create_task(_run_health_checks())
+        status_code, payload = await asyncio.shield(_health_refresh)
+    response.status_code = status_code
+    return payload
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Request  # Added Request
 from fastapi.security import OAuth2PasswordRequestForm
@@ -39,8 +40,9 @@ async def login_for_access_token(
     password = form_data.password
     logger.info(f"Login attempt for email: {email}")
     try:
-        auth_response = supabase_client.auth.sign_in_with_password(
-            {"email": email, "password": password}
+        auth_response = await asyncio.to_thread(
+            supabase_client.auth.sign_in_with_password,
+            {"email": email, "password": password},
         )
 
         if (
@@ -57,14 +59,15 @@ async def login_for_access_token(
             )
 
         logger.info(f"Successful login for email: {email}")
-        # Map response to Pydantic Token model (V2 uses model_validate)
-        token_data = {
-            "access_token": auth_response.session.access_token,
-            "token_type": getattr(auth_response.session, "token_type", "bearer"),
-            "refresh_token": getattr(auth_response.session, "refresh_token", None),
-            "expires_in": getattr(auth_response.session, "expires_in", None),
-        }
-        return token_schema.Token.model_validate(token_data)
+        # The session is already a validated gotrue model with these typed fields,
+        # so construct the Token directly instead of validating it a second time
+        session = auth_response.session
+        return token_schema.Token.model_construct(
+            access_token=session.access_token,
+            token_type=session.token_type or "bearer",
+            refresh_token=session.refresh_token,
+            expires_in=session.expires_in,
+        )
 
     except AuthApiError as e:
         auth_error_msg = getattr(e, "message", str(e))
@@ -1,126 +1,226 @@
+import asyncio
+import base64
+import binascii
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.security import OAuth2PasswordRequestForm
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+
+import httpx
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
 from supabase import Client
-from gotrue.errors import AuthApiError
 
-from app.schemas import token as token_schema
+from app.schemas import lead as lead_schema
 from app.schemas import user as user_schema
 from app.api import deps
 from app.main import limiter
 from app.core.config import settings
 from app.services.pineapple_api import transfer_lead
+from app.services.lead_transfer_queue import LeadTransferJob, LeadTransferQueue
+from app.crud import crud_lead
 from app.models.pineapple import LeadTransferRequest, LeadTransferResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _encode_page_cursor(cursor: Tuple[str, str]) -> str:
+    """Packs a (created_at, id) keyset cursor into an opaque URL-safe token."""
+    return base64.urlsafe_b64encode(orjson.dumps(cursor)).decode()
+
+
+def _decode_page_cursor(token: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Unpacks a client-supplied cursor into a typed (created_at, id) pair. The values end
+    up in a PostgREST filter, so anything that is not a timezone-aware ISO timestamp
+    and a UUID is rejected with a 400 rather than passed through.
+    """
+    try:
+        created_at, last_id = orjson.loads(base64.urlsafe_b64decode(token))
+        if not isinstance(created_at, str) or not isinstance(last_id, str):
+            raise ValueError("cursor values must be strings")
+        created_at_dt = datetime.fromisoformat(created_at)
+        if created_at_dt.tzinfo is None:
+            raise ValueError("cursor timestamp must carry a UTC offset")
+        return created_at_dt, uuid.UUID(last_id)
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid page cursor."
+        )
+
+
+def _transfer_queue_full_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Lead transfer queue is full. Please retry shortly.",
+        headers={"Retry-After": "5"},
+    )
+
+
+@router.post("/transfer", response_model=LeadTransferResponse)
+@limiter.limit(settings.LEAD_TRANSFER_RATE_LIMIT)
+async def create_lead_transfer(
+    request: Request,
+    lead_request: LeadTransferRequest,
+    current_user: user_schema.User = Depends(deps.get_current_user),
+    db: Client = Depends(deps.get_db),
+    pineapple_client: httpx.AsyncClient = Depends(deps.get_pineapple_client),
+):
+    """
+    Transfer a lead to Pineapple's system.
+
+    This endpoint forwards lead information to Pineapple and returns a success status and redirect URL.
+    """
+    response = await transfer_lead(lead_request, pineapple_client)
+    logger.info(f"Lead transfer successful for user {current_user.id}")
+    return response
+
+
 @router.post(
-    "/login",
-    response_model=token_schema.Token,
-    summary="Login for Access Token",
-    description="Authenticate using email and password to receive JWT access and refresh tokens.",
+    "/transfer/async",
+    response_model=lead_schema.LeadResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue a Lead Transfer",
+    description="Stores the lead locally and queues it for transfer to Pineapple. Returns immediately; the local lead record is updated once the transfer completes.",
     responses={
-        status.HTTP_401_UNAUTHORIZED: {"description": "Incorrect email or password"},
-        status.HTTP_429_TOO_MANY_REQUESTS: {"description": "Rate limit exceeded"},
-        status.HTTP_500_INTERNAL_SERVER_ERROR: {"description": "Internal server error"},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"description": "Transfer queue is full"}
     },
 )
-@limiter.limit(settings.LOGIN_RATE_LIMIT)
-async def login_for_access_token(
+@limiter.limit(settings.LEAD_TRANSFER_RATE_LIMIT)
+async def queue_lead_transfer(
     request: Request,
-    form_data: OAuth2PasswordRequestForm = Depends(),
-    supabase_client: Client = Depends(deps.get_db),
+    lead_in: lead_schema.LeadCreate,
+    current_user: user_schema.User = Depends(deps.get_current_user),
+    db: Client = Depends(deps.get_db),
+    transfer_queue: LeadTransferQueue = Depends(deps.get_lead_transfer_queue),
 ):
     """
-    OAuth2 compatible token login using Supabase email/password sign-in.
-    Rate limited.
+    Queues a lead for transfer to Pineapple:
+    1. Creates a local lead record with status `pending_transfer`.
+    2. Enqueues the Pineapple payload for the background transfer workers.
+    3. Returns the local reference ID (the Pineapple UUID/redirect are stored on the record later).
+    Returns 503 without storing anything while the transfer queue is full.
     """
-    email = form_data.username
-    password = form_data.password
-    logger.info(f"Login attempt for email: {email}")
-    try:
-        auth_response = supabase_client.auth.sign_in_with_password(
-            {"email": email, "password": password}
-        )
+    if transfer_queue.full():
+        raise _transfer_queue_full_exception()
 
-        if (
-            not auth_response
-            or not auth_response.session
-            or not auth_response.session.access_token
-        ):
-            logger.error(
-                f"Unexpected Supabase sign-in response format for email {email}: {auth_response}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Login failed due to unexpected response format from auth provider.",
-            )
-
-        logger.info(f"Successful login for email: {email}")
-        token_data = {
-            "access_token": auth_response.session.access_token,
-            "token_type": getattr(auth_response.session, "token_type", "bearer"),
-            "refresh_token": getattr(auth_response.session, "refresh_token", None),
-            "expires_in": getattr(auth_response.session, "expires_in", None),
-        }
-        return token_schema.Token.model_validate(token_data)
-
-    except AuthApiError as e:
-        auth_error_msg = getattr(e, "message", str(e))
-        auth_error_status = getattr(e, "status", "N/A")
-        logger.warning(
-            f"Supabase Sign-in Error for email {email}: {auth_error_msg} (Status: {auth_error_status})"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    except Exception as e:
-        logger.exception(f"Unexpected error during login for email {email}")
+    # lead_in was validated on ingress (including the email), so the row is passed to
+    # the CRUD layer as a plain dict rather than re-validated into a LeadRecordCreate
+    # The ID is generated here, so the queued job never depends on what the insert
+    # returned (RLS may hide the row) or on the CRUD helper filling it in
+    local_lead_id = str(uuid.uuid4())
+    record_in = {
+        "id": local_lead_id,
+        "user_id": str(current_user.id),
+        "status": "pending_transfer",
+        **lead_in.model_dump(),
+    }
+    created_record = await asyncio.to_thread(
+        crud_lead.create_lead_record, db=db, lead_in=record_in
+    )
+    if not created_record:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An internal server error occurred during login.",
+            detail="Failed to save lead internally before queueing transfer.",
+        )
+
+    payload = lead_schema.PineappleLeadTransferRequest(
+        source=settings.PINEAPPLE_SOURCE_NAME,
+        **lead_in.model_dump(exclude={"local_quote_reference_id"}),
+    ).model_dump()
+    try:
+        transfer_queue.submit(
+            LeadTransferJob(local_lead_id=local_lead_id, payload=payload)
+        )
+    except asyncio.QueueFull:
+        # Filled up while the record was being stored; settle it rather than leave
+        # it pending for a transfer that will never run
+        await asyncio.to_thread(
+            crud_lead.update_lead_record,
+            db,
+            local_lead_id=local_lead_id,
+            lead_update_data=lead_schema.LeadRecordUpdate(
+                status="failed_transfer", error_message="Transfer queue was full."
+            ),
         )
+        raise _transfer_queue_full_exception()
+    logger.info(f"Lead {local_lead_id} queued for transfer by user {current_user.id}")
 
+    return lead_schema.LeadResponse(
+        success=True,
+        message="Lead accepted and queued for transfer.",
+        local_lead_reference_id=local_lead_id,
+    )
 
-@router.post(
-    "/test-token", response_model=user_schema.User, summary="Test Authentication Token"
+
+@router.get(
+    "/",
+    response_model=lead_schema.LeadRecordPage,
+    summary="List Lead Records",
+    description="Returns the authenticated user's lead records, newest first.",
 )
-async def test_token(
+async def list_leads(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None,
+        description="`next_cursor` from the previous page; cannot be combined with `skip`",
+    ),
     current_user: user_schema.User = Depends(deps.get_current_user),
+    db: Client = Depends(deps.get_db),
 ):
     """
-    Test endpoint requiring a valid bearer token. Returns user information if the token is valid.
-    Useful for frontend checks to see if the user is still logged in.
+    Lists the current user's lead records with the total count for pagination.
+    Following `next_cursor` seeks straight to the next page, so deep pages are as
+    cheap as the first; `skip` is kept for existing clients.
     """
-    logger.info(f"Token test successful for user ID: {current_user.id}")
-    return current_user
+    if cursor and skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either `cursor` or `skip`, not both.",
+        )
+    result = await asyncio.to_thread(
+        crud_lead.get_lead_records_for_user,
+        db,
+        str(current_user.id),
+        skip=skip,
+        limit=limit,
+        cursor=_decode_page_cursor(cursor) if cursor else None,
+    )
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to load lead records.",
+        )
+    rows, total, next_cursor = result
+    return lead_schema.LeadRecordPage(
+        items=lead_schema.LeadRecordList.validate_python(rows),
+        total=total,
+        skip=skip,
+        limit=limit,
+        next_cursor=_encode_page_cursor(next_cursor) if next_cursor else None,
+    )
 
 
-@router.post("/transfer", response_model=LeadTransferResponse)
-async def create_lead_transfer(
-    lead_request: LeadTransferRequest,
+@router.get(
+    "/{lead_id}",
+    response_model=lead_schema.LeadRecord,
+    summary="Get a Lead Record",
+    responses={status.HTTP_404_NOT_FOUND: {"description": "Lead not found"}},
+)
+async def get_lead(
+    lead_id: str,
     current_user: user_schema.User = Depends(deps.get_current_user),
     db: Client = Depends(deps.get_db),
 ):
-    """
-    Transfer a lead to Pineapple's system.
-
-    This endpoint forwards lead information to Pineapple and returns a success status and redirect URL.
-    """
-    try:
-        response = transfer_lead(lead_request.model_dump())
-        logger.info(f"Lead transfer successful for user {current_user.id}")
-        return response
-    except Exception as e:
-        logger.error(f"Error transferring lead: {str(e)}")
+    """Returns one of the current user's lead records by its local reference ID."""
+    record = await asyncio.to_thread(crud_lead.get_lead_record_by_local_id, db, lead_id)
+    if not record or str(record.get("user_id")) != str(current_user.id):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to transfer lead: {str(e)}",
+            status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found."
         )
+    return record
 
 
 # Optional: Add token refresh endpoint if manual refresh is needed by clients
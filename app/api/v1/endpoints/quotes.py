@@ -1,18 +1,23 @@
+import asyncio
 import logging
 import uuid
+from typing import Dict, Set, Tuple
+import httpx
+from pydantic import ValidationError
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
     status,
     Request,
-    BackgroundTasks,
+    Response,
 )
 
 from app.api import deps
 from app.schemas import quote as quote_schema
 from app.schemas import user as user_schema
-from app.services.pineapple_api import get_quick_quote
+from app.services import quote_cache
+from app.services.pineapple_api import PineappleAPIError, get_quick_quote
 from app.models.pineapple import QuickQuoteRequest, QuickQuoteResponse
 from app.core.config import settings
 from app.crud import crud_quote
@@ -22,11 +27,20 @@ from app.main import limiter
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Quote requests currently being processed, keyed like the quote cache. Each task
+# yields the response and whether it is a stale cached fallback.
+_inflight_quotes: Dict[str, "asyncio.Task[Tuple[quote_schema.QuoteResponse, bool]]"] = (
+    {}
+)
+# Success-path record updates started by the shared quote task; kept referenced so
+# they finish even if every caller has disconnected
+_record_update_tasks: Set[asyncio.Task] = set()
+
 
-async def update_quote_record_background(
+def update_quote_record_background(
     db: Client, local_quote_id: str, update_data: quote_schema.QuoteRecordUpdate
 ):
-    """Task to update quote record in the background."""
+    """Task to update quote record in the background (sync, so it runs in a worker thread)."""
     logger.info(
         f"[BG Task] Updating quote record {local_quote_id} with status {update_data.status}..."
     )
@@ -48,6 +62,43 @@ async def update_quote_record_background(
         )
 
 
+def _check_vehicle_count(vehicles: list) -> None:
+    """Rejects oversized quote requests before any DB or Pineapple work is done."""
+    if len(vehicles) > settings.MAX_VEHICLES_PER_QUOTE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A quote may include at most {settings.MAX_VEHICLES_PER_QUOTE} vehicles.",
+        )
+
+
+def _schedule_quote_record_update(
+    db: Client, local_quote_id: str, update_data: quote_schema.QuoteRecordUpdate
+) -> None:
+    """
+    Updates the quote record off the response path. Not a BackgroundTasks job: the
+    shared single-flight task may outlive the caller whose response it would ride on.
+    """
+    task = asyncio.create_task(
+        asyncio.to_thread(
+            update_quote_record_background, db, local_quote_id, update_data
+        )
+    )
+    _record_update_tasks.add(task)
+    task.add_done_callback(_record_update_tasks.discard)
+
+
+def _stale_quote_fallback(cache_key: str) -> quote_schema.QuoteResponse | None:
+    """Returns the last-known-good quote for this request if fallback is enabled."""
+    if not settings.CACHE_FALLBACK_ENABLED:
+        return None
+    stale_response = quote_cache.get_stale_quote(cache_key)
+    if stale_response is not None:
+        logger.warning(
+            f"Pineapple quote failed, serving stale cached quote {stale_response.quote_id}"
+        )
+    return stale_response
+
+
 @router.post(
     "/quick",
     response_model=quote_schema.QuoteResponse,
@@ -74,128 +125,270 @@ async def update_quote_record_background(
 async def request_quick_quote(
     *,
     request: Request,
-    background_tasks: BackgroundTasks,
+    response: Response,
     db: Client = Depends(deps.get_db),
     current_user: user_schema.User = Depends(deps.get_current_user),
+    pineapple_client: httpx.AsyncClient = Depends(deps.get_pineapple_client),
     quote_input: quote_schema.QuoteRequest,
 ):
     """
     Requests a quick insurance quote:
-    1. Creates a local record for the quote request attempt.
+    1. Creates a local record for the quote request attempt and, concurrently,
     2. Calls the external Pineapple Quick Quote API.
     3. Returns the quote result from Pineapple (including `quote_id` needed for lead transfer).
     4. Updates the local quote record status in the background.
+
+    Identical concurrent requests share a single Pineapple call. If Pineapple fails and
+    `CACHE_FALLBACK_ENABLED` is set, the last successful quote for the same input is
+    returned instead, marked with an `X-Cache: STALE` header.
     """
     endpoint_log_ref = f"user_id={current_user.id}"
     logger.info(f"Quote request received from {endpoint_log_ref}")
+    _check_vehicle_count(quote_input.vehicles)
+
+    # Identical re-submissions (retries, form re-posts) reuse the recent result and
+    # skip both the Pineapple call and a duplicate local record
+    cache_key = quote_cache.quote_cache_key(
+        str(current_user.id), quote_input.model_dump()
+    )
+    cached_response = quote_cache.get_cached_quote(cache_key)
+    if cached_response is not None:
+        logger.info(f"Returning cached quote for {endpoint_log_ref}")
+        return cached_response
+
+    # Single-flight: an identical request already in progress is awaited rather than
+    # sent to Pineapple again. The shared task outlives a disconnecting first caller,
+    # so it is not tied to any one caller's response.
+    inflight = _inflight_quotes.get(cache_key)
+    if inflight is None:
+        inflight = asyncio.create_task(
+            _obtain_quick_quote(
+                db=db,
+                current_user=current_user,
+                pineapple_client=pineapple_client,
+                quote_input=quote_input,
+                cache_key=cache_key,
+            )
+        )
+        _inflight_quotes[cache_key] = inflight
+        inflight.add_done_callback(lambda task: _finish_inflight_quote(cache_key, task))
+    else:
+        logger.info(f"Joining in-flight quote request for {endpoint_log_ref}")
+    quote_response, is_stale = await asyncio.shield(inflight)
+    if is_stale:
+        response.headers["X-Cache"] = "STALE"
+    return quote_response
+
+
+def _finish_inflight_quote(cache_key: str, task: asyncio.Task) -> None:
+    _inflight_quotes.pop(cache_key, None)
+    if not task.cancelled():
+        task.exception()  # Mark as retrieved even if every awaiter has gone away
+
+
+async def _obtain_quick_quote(
+    *,
+    db: Client,
+    current_user: user_schema.User,
+    pineapple_client: httpx.AsyncClient,
+    quote_input: quote_schema.QuoteRequest,
+    cache_key: str,
+) -> Tuple[quote_schema.QuoteResponse, bool]:
+    """
+    Creates the local record, calls Pineapple and builds the quote response. Returns
+    the response and whether it is a stale cached fallback (callers set `X-Cache`).
+    """
+    endpoint_log_ref = f"user_id={current_user.id}"
     local_quote_ref_id = str(uuid.uuid4())
-    pineapple_client = request.app.state.pineapple_client
 
+    # Built from already-validated input, so passed to the CRUD layer as a plain dict
+    # rather than re-validated into a QuoteRecordCreate and dumped again
+    quote_record_in = {
+        "id": local_quote_ref_id,
+        "user_id": str(current_user.id),
+        "request_details": quote_input.model_dump(),
+        "status": "pending_external",
+    }
+
+    # QuoteRequestVehicle subclasses PineappleVehicle and was validated on ingress,
+    # so the vehicles are passed through as-is instead of dumped and re-validated
+    pineapple_request = quote_schema.PineappleQuickQuoteRequest(
+        source=settings.PINEAPPLE_SOURCE_NAME,
+        externalReferenceId=local_quote_ref_id,
+        vehicles=quote_input.vehicles,
+    )
+
+    # The record uses our client-generated ID, so the insert does not need to finish
+    # before Pineapple is called: start it as a task and only await it once the
+    # Pineapple call has returned, overlapping the two latencies.
     logger.debug(
         f"Creating initial quote record {local_quote_ref_id} for {endpoint_log_ref}"
     )
-    quote_record_in = quote_schema.QuoteRecordCreate(
-        id=local_quote_ref_id,
-        user_id=str(current_user.id),
-        request_details=quote_input.model_dump(),
-        status="pending_external",
-    )
-    created_record_dict = crud_quote.create_quote_record(
-        db=db, quote_in=quote_record_in
+    insert_task = asyncio.create_task(
+        asyncio.to_thread(
+            crud_quote.create_quote_record, db=db, quote_in=quote_record_in
+        )
     )
+    try:
+        pineapple_response = await get_quick_quote(pineapple_request, pineapple_client)
+        update_data, response_payload = _parse_quick_quote_response(
+            pineapple_response, local_quote_ref_id
+        )
+    except PineappleAPIError as e:
+        # Don't leave the record stuck in `pending_external` after a failed call
+        await _mark_quote_record_failed(
+            insert_task, db, local_quote_ref_id, "failed_external", str(e)
+        )
+        stale_response = _stale_quote_fallback(cache_key)
+        if stale_response is not None:
+            return stale_response, True
+        raise
+    except BaseException:
+        await _mark_quote_record_failed(
+            insert_task,
+            db,
+            local_quote_ref_id,
+            "failed_internal",
+            "Unexpected error while obtaining quote.",
+        )
+        raise
+    created_record_dict = await insert_task
     if not created_record_dict:
         logger.error(
             f"Failed to create initial quote record in DB for {endpoint_log_ref}, ref {local_quote_ref_id}"
         )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to save quote request internally before contacting provider.",
+            detail="Failed to save quote request internally.",
         )
-    local_quote_ref_id = created_record_dict.get("id", local_quote_ref_id)
     logger.info(
         f"Initial quote record {local_quote_ref_id} created for {endpoint_log_ref}"
     )
 
-    pineapple_vehicles = [
-        quote_schema.PineappleVehicle.model_validate(vehicle.model_dump())
-        for vehicle in quote_input.vehicles
-    ]
-
-    pineapple_request = quote_schema.PineappleQuickQuoteRequest(
-        source=settings.PINEAPPLE_SOURCE_NAME,
-        externalReferenceId=local_quote_ref_id,
-        vehicles=pineapple_vehicles,
-    )
-    pineapple_response = get_quick_quote(pineapple_request.model_dump())
-
-    update_data = quote_schema.QuoteRecordUpdate()
-    response_payload: quote_schema.QuoteResponse | None = None
-
-    if (
-        pineapple_response["success"]
-        and pineapple_response["id"]
-        and pineapple_response["data"]
-    ):
-        pineapple_quote_id = pineapple_response["id"]
-        logger.info(
-            f"Successfully obtained quote {pineapple_quote_id} from Pineapple for local ref {local_quote_ref_id}"
-        )
-        update_data.status = "success"
-        update_data.pineapple_quote_id = pineapple_quote_id
-        update_data.response_details = pineapple_response
-        update_data.premium = pineapple_response["data"][0]["premium"]
-        update_data.excess = pineapple_response["data"][0]["excess"]
-
-        response_payload = quote_schema.QuoteResponse(
-            success=True,
-            quote_id=pineapple_quote_id,
-            quote_data=[
-                quote_schema.QuoteResponseData.model_validate(item)
-                for item in pineapple_response["data"]
-            ],
-            local_quote_reference_id=local_quote_ref_id,
-            message="Quote retrieved successfully.",
-        )
-        background_tasks.add_task(
+    if response_payload is None:
+        # Background tasks don't run when the handler raises, so update inline
+        await asyncio.to_thread(
             update_quote_record_background, db, local_quote_ref_id, update_data
         )
-        logger.info(
-            f"Scheduled background task to update quote record {local_quote_ref_id} with success status."
+        stale_response = _stale_quote_fallback(cache_key)
+        if stale_response is not None:
+            return stale_response, True
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to get quote from external provider: {update_data.error_message}",
         )
 
-        return response_payload
+    _schedule_quote_record_update(db, local_quote_ref_id, update_data)
+    logger.info(
+        f"Scheduled background task to update quote record {local_quote_ref_id} with success status."
+    )
+    quote_cache.cache_quote(cache_key, response_payload)
+    return response_payload, False
 
-    else:
+
+def _parse_quick_quote_response(
+    pineapple_response: dict, local_quote_ref_id: str
+) -> Tuple[quote_schema.QuoteRecordUpdate, quote_schema.QuoteResponse | None]:
+    """
+    Builds the record update and, on success, the quote response from a Pineapple
+    quick-quote body. A body that doesn't have the expected shape raises
+    PineappleAPIError, so it is handled like any other provider failure.
+    """
+    try:
+        update_data = quote_schema.QuoteRecordUpdate(
+            response_details=pineapple_response
+        )
+        if (
+            pineapple_response["success"]
+            and pineapple_response["id"]
+            and pineapple_response["data"]
+        ):
+            pineapple_quote_id = pineapple_response["id"]
+            logger.info(
+                f"Successfully obtained quote {pineapple_quote_id} from Pineapple for local ref {local_quote_ref_id}"
+            )
+            update_data.status = "success"
+            update_data.pineapple_quote_id = pineapple_quote_id
+            update_data.premium = pineapple_response["data"][0]["premium"]
+            update_data.excess = pineapple_response["data"][0]["excess"]
+
+            response_payload = quote_schema.QuoteResponse(
+                success=True,
+                quote_id=pineapple_quote_id,
+                quote_data=quote_schema.QuoteResponseDataList.validate_python(
+                    pineapple_response["data"]
+                ),
+                local_quote_reference_id=local_quote_ref_id,
+                message="Quote retrieved successfully.",
+            )
+            return update_data, response_payload
         error_msg = (
             pineapple_response.get("message", "")
             or "Unknown failure from external quote provider."
         )
+    except (KeyError, IndexError, TypeError, AttributeError, ValidationError) as e:
         logger.error(
-            f"Failed to get quote from Pineapple for local ref {local_quote_ref_id}. Reason: {error_msg}"
+            f"Malformed quote response from Pineapple for local ref {local_quote_ref_id}: {e!r}"
         )
-        update_data.status = "failed_external"
-        update_data.error_message = error_msg
-        update_data.response_details = pineapple_response
+        raise PineappleAPIError(
+            "Malformed quote response from external provider."
+        ) from e
 
-        background_tasks.add_task(
-            update_quote_record_background, db, local_quote_ref_id, update_data
-        )
-        logger.info(
-            f"Scheduled background task to update quote record {local_quote_ref_id} with failure status."
-        )
+    logger.error(
+        f"Failed to get quote from Pineapple for local ref {local_quote_ref_id}. Reason: {error_msg}"
+    )
+    update_data.status = "failed_external"
+    update_data.error_message = error_msg
+    return update_data, None
 
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to get quote from external provider: {error_msg}",
+
+async def _mark_quote_record_failed(
+    insert_task: asyncio.Task,
+    db: Client,
+    local_quote_ref_id: str,
+    record_status: str,
+    error_message: str,
+) -> None:
+    """
+    Waits for the initial insert and marks the record failed. Errors are logged rather
+    than raised so they don't mask the failure being handled.
+    """
+    try:
+        if await insert_task:
+            await asyncio.to_thread(
+                update_quote_record_background,
+                db,
+                local_quote_ref_id,
+                quote_schema.QuoteRecordUpdate(
+                    status=record_status, error_message=error_message
+                ),
+            )
+    except Exception:
+        logger.exception(
+            f"Failed to mark quote record {local_quote_ref_id} as {record_status}"
         )
 
-    logger.error(
-        f"Reached end of quote endpoint unexpectedly for {endpoint_log_ref}, ref {local_quote_ref_id}"
-    )
-    raise HTTPException(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        detail="Internal processing error.",
+
+@router.get(
+    "/{quote_id}",
+    response_model=quote_schema.QuoteRecord,
+    summary="Get a Quote Record",
+    responses={status.HTTP_404_NOT_FOUND: {"description": "Quote not found"}},
+)
+async def get_quote(
+    quote_id: str,
+    db: Client = Depends(deps.get_db),
+    current_user: user_schema.User = Depends(deps.get_current_user),
+):
+    """Returns one of the current user's quote records by its local reference ID."""
+    record = await asyncio.to_thread(
+        crud_quote.get_quote_record_by_local_id, db, quote_id
     )
+    if not record or str(record.get("user_id")) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Quote not found."
+        )
+    return record
 
 
 @router.post(
@@ -204,18 +397,12 @@ async def request_quick_quote(
 async def create_quick_quote(
     quote_request: QuickQuoteRequest,
     current_user: user_schema.User = Depends(deps.get_current_user),
+    pineapple_client: httpx.AsyncClient = Depends(deps.get_pineapple_client),
 ):
     """
     Submit a vehicle insurance quick quote request to get premium estimate.
 
     This endpoint forwards the request to Pineapple's API and returns premium information.
     """
-    try:
-        response = get_quick_quote(quote_request.model_dump())
-        return response
-    except Exception as e:
-        logger.error(f"Error processing quick quote: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get insurance quote: {str(e)}",
-        )
+    _check_vehicle_count(quote_request.vehicles)
+    return await get_quick_quote(quote_request, pineapple_client)
@@ -1,5 +1,6 @@
 import os
 import logging
+from functools import lru_cache
 from typing import List, Any
 
 from pydantic import (
@@ -10,9 +11,12 @@ from pydantic import (
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
-# Load .env file variables
+# Load .env file variables (the only place .env is parsed; Settings reads os.environ)
 load_dotenv()
 
+_VALID_LOG_LEVELS = frozenset(logging._nameToLevel)
+_VALID_LOG_LEVELS_MSG = ", ".join(sorted(_VALID_LOG_LEVELS))
+
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Pineapple Integration API - V2"
@@ -21,6 +25,8 @@ class Settings(BaseSettings):
     # --- Required Settings (with environment variable defaults) ---
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")  # Anon or Service key
+    # Legacy HS256 JWT secret; when set, such tokens are verified locally
+    SUPABASE_JWT_SECRET: str = os.getenv("SUPABASE_JWT_SECRET", "")
 
     # Fix Pineapple API URL handling - check both variable names
     PINEAPPLE_API_URL: str = os.getenv(
@@ -48,19 +54,33 @@ class Settings(BaseSettings):
 
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
 
+    # Serve the last successful quick quote for an identical request when Pineapple fails
+    CACHE_FALLBACK_ENABLED: bool = (
+        os.getenv("CACHE_FALLBACK_ENABLED", "false").lower() == "true"
+    )
+
     # Keep original field name to match environment variables
     BACKEND_CORS_ORIGINS: str = os.getenv("BACKEND_CORS_ORIGINS", "*")
 
     # Rate Limiting Defaults: Uses os.getenv within the model for flexibility
     DEFAULT_RATE_LIMIT: str = os.getenv("DEFAULT_RATE_LIMIT", "100/hour")
     LOGIN_RATE_LIMIT: str = os.getenv("LOGIN_RATE_LIMIT", "10/minute")
+    LEAD_TRANSFER_RATE_LIMIT: str = os.getenv("LEAD_TRANSFER_RATE_LIMIT", "30/minute")
+
+    # Upper bound on vehicles in one quick quote request (each one is priced by Pineapple)
+    MAX_VEHICLES_PER_QUOTE: int = int(os.getenv("MAX_VEHICLES_PER_QUOTE", "20"))
+
+    # Worker threads for blocking Supabase calls offloaded with asyncio.to_thread; bounds
+    # how many PostgREST round-trips can be in flight at once
+    DB_THREADPOOL_SIZE: int = int(os.getenv("DB_THREADPOOL_SIZE", "64"))
 
     # Update to Pydantic v2 style configuration
     model_config = {
         "case_sensitive": True,
-        "env_file": ".env",
-        "env_file_encoding": "utf-8",
+        # No "env_file": load_dotenv() above has already put .env into os.environ
+        # (without overriding real variables), so parsing it again adds nothing
         "extra": "ignore",  # Add this to ignore extra fields from environment
+        "frozen": True,  # Read once at startup; never mutated afterwards
     }
 
     # Validate LOG_LEVEL using Pydantic V2 model validation
@@ -68,16 +88,22 @@ class Settings(BaseSettings):
     @classmethod
     def check_log_level(cls, v: str) -> str:
         level = v.upper()
-        if level not in logging._nameToLevel:
+        if level not in _VALID_LOG_LEVELS:
             raise ValueError(
-                f"Invalid LOG_LEVEL: {v}. Must be one of {list(logging._nameToLevel.keys())}"
+                f"Invalid LOG_LEVEL: {v}. Must be one of {_VALID_LOG_LEVELS_MSG}"
             )
         return level
 
 
+@lru_cache
+def get_settings() -> Settings:
+    """Returns the process-wide Settings, reading the environment only once."""
+    return Settings()
+
+
 # Create the settings instance (add try/except for better startup debugging)
 try:
-    settings = Settings()
+    settings = get_settings()
     # Log loaded settings (avoid logging sensitive keys like SUPABASE_KEY, PINEAPPLE_API_TOKEN in production)
     # Ensure logger is configured before using it here (main.py handles this)
     temp_logger = logging.getLogger(
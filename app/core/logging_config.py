@@ -7,33 +7,47 @@ import sys
 # Import settings carefully, ensure it's loaded when needed
 # from app.core.config import settings
 
+PLAIN_LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
 
 def setup_logging(log_level_str: str = "INFO"):  # Pass level from main.py
-    """Configures logging using Rich Handler."""
+    """
+    Configures logging: Rich Handler on an interactive terminal, otherwise (containers,
+    log shippers) a plain StreamHandler, which formats records far more cheaply.
+    """
     log_level = getattr(logging, log_level_str.upper(), logging.INFO)
 
-    # Base configuration using RichHandler
+    if sys.stderr.isatty():
+        handler: logging.Handler = RichHandler(
+            rich_tracebacks=True,
+            tracebacks_word_wrap=False,
+            tracebacks_suppress=[fastapi, httpx],  # Optional: Clean up tracebacks
+            markup=True,  # Enable Rich markup
+        )
+        log_format = "%(message)s"  # RichHandler manages format based on context
+        datefmt = "[%X]"  # Time format for logs
+    else:
+        handler = logging.StreamHandler(sys.stderr)
+        log_format = PLAIN_LOG_FORMAT
+        datefmt = None
+
     logging.basicConfig(
         level=log_level,
-        format="%(message)s",  # RichHandler manages format based on context
-        datefmt="[%X]",  # Time format for logs
-        handlers=[
-            RichHandler(
-                rich_tracebacks=True,
-                tracebacks_word_wrap=False,
-                tracebacks_suppress=[fastapi, httpx],  # Optional: Clean up tracebacks
-                markup=True,  # Enable Rich markup
-            )
-        ],
+        format=log_format,
+        datefmt=datefmt,
+        handlers=[handler],
         force=True,  # Override any existing handlers (useful if re-running setup)
     )
 
     # Silence overly verbose libraries if necessary
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
     # logging.getLogger("httpx").setLevel(logging.WARNING) # Uncomment if httpx is too noisy
 
     logger = logging.getLogger(__name__)
-    logger.info(f"Logging configured with handler: RichHandler, level: {log_level_str}")
+    logger.info(
+        f"Logging configured with handler: {type(handler).__name__}, level: {log_level_str}"
+    )
 
 
 # Call setup_logging() ONCE at application startup (e.g., in main.py lifespan start), passing settings.LOG_LEVEL
@@ -1,25 +1,64 @@
 import logging
 from supabase import Client
 from app.schemas import lead as lead_schema  # Use alias
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union, Tuple
+import threading
 import uuid
+from datetime import datetime
+
+from cachetools import TTLCache
 
 # from postgrest.exceptions import APIError # Import specific Supabase errors if needed
 
 logger = logging.getLogger(__name__)
 
+# Rows per insert request in the bulk create helpers; keeps request bodies well under
+# PostgREST/proxy payload limits
+BULK_INSERT_CHUNK_SIZE = 1000
+# IDs per `in.(...)` filter in the batch getters; keeps the query string well under
+# PostgREST/proxy URL length limits
+IN_QUERY_CHUNK_SIZE = 200
+
 # Assume 'leads' table exists matching LeadRecord schema
 
+# Short-lived cache of lead records by local ID, invalidated on update. Guarded by a
+# lock because CRUD functions are also called from worker threads.
+_lead_cache: TTLCache = TTLCache(maxsize=5000, ttl=15)
+_lead_cache_lock = threading.Lock()
+
+
+# Per-user lead totals for the paginated listing. Page turns reuse the total instead
+# of asking PostgREST to count again; creates for the user evict it. Also guarded by
+# _lead_cache_lock.
+_lead_count_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+
+
+def _invalidate_cached_lead(local_lead_id: str) -> None:
+    with _lead_cache_lock:
+        _lead_cache.pop(local_lead_id, None)
+
+
+def _invalidate_cached_lead_count(user_id: Any) -> None:
+    with _lead_cache_lock:
+        _lead_count_cache.pop(str(user_id), None)
+
 
 def create_lead_record(
-    db: Client, *, lead_in: lead_schema.LeadRecordCreate
+    db: Client, *, lead_in: Union[lead_schema.LeadRecordCreate, Dict[str, Any]]
 ) -> Optional[Dict[str, Any]]:
-    """Creates a lead record in Supabase 'leads' table."""
-    if not lead_in.id:  # Generate UUID if not provided during creation
-        lead_in.id = str(uuid.uuid4())
-
-    # Use model_dump for Pydantic V2
-    lead_data = lead_in.model_dump()
+    """
+    Creates a lead record in Supabase 'leads' table. Internal callers that build the
+    row themselves may pass a plain dict, which is inserted as-is (skipping model
+    validation and model_dump); a missing ID is generated in place.
+    """
+    if isinstance(lead_in, dict):
+        lead_data = lead_in
+        if not lead_data.get("id"):
+            lead_data["id"] = str(uuid.uuid4())
+    else:
+        if not lead_in.id:  # Generate UUID if not provided during creation
+            lead_in.id = str(uuid.uuid4())
+        lead_data = lead_in.model_dump()
     log_ref_id = lead_data.get("id", "N/A")
     log_ref_user = lead_data.get("user_id", "N/A")
     logger.info(
@@ -27,8 +66,9 @@ def create_lead_record(
     )
 
     try:
-        # Check supabase-py docs for exact syntax V2+ (insert might take dict)
-        response = db.table("leads").insert(lead_data).execute()
+        response = (
+            db.table("leads").insert(lead_data, returning="representation").execute()
+        )
 
         if response.data:
             logger.info(
@@ -39,11 +79,47 @@ def create_lead_record(
             logger.warning(
                 f"Supabase insert for lead {log_ref_id} returned no data. Response: {response}"
             )
-            # RLS might prevent returning data, try fetching if critical
-            return get_lead_record_by_local_id(db, str(log_ref_id))
+            # RLS may hide the returned row; the payload already carries the generated ID,
+            # so return it rather than paying for a second round-trip to re-select it
+            return lead_data
     except Exception as e:  # Catch potential PostgrestAPIError etc.
         logger.exception(f"Database error creating lead record id {log_ref_id}: {e}")
         return None  # Indicate failure
+    finally:
+        _invalidate_cached_lead_count(log_ref_user)
+
+
+def create_lead_records_bulk(
+    db: Client, *, leads_in: List[lead_schema.LeadRecordCreate]
+) -> List[Dict[str, Any]]:
+    """
+    Creates many lead records with one insert request per chunk of
+    BULK_INSERT_CHUNK_SIZE rows, instead of one PostgREST round-trip per row.
+    Returns the created rows in input order; a failed chunk is logged and stops the
+    batch, so a shorter result means only the leading rows were stored.
+    """
+    for lead_in in leads_in:
+        if not lead_in.id:  # Generate UUIDs up front so rows can be correlated
+            lead_in.id = str(uuid.uuid4())
+    rows = [lead_in.model_dump() for lead_in in leads_in]
+    logger.info(f"Attempting to bulk create {len(rows)} lead record(s)")
+
+    created: List[Dict[str, Any]] = []
+    for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+        chunk = rows[start : start + BULK_INSERT_CHUNK_SIZE]
+        try:
+            response = db.table("leads").insert(chunk).execute()
+        except Exception as e:
+            logger.exception(
+                f"Database error bulk creating lead records {start}-{start + len(chunk) - 1}: {e}"
+            )
+            break
+        # RLS may prevent returning rows; the inserted payload carries the same IDs
+        created.extend(response.data or chunk)
+    for user_id in {row.get("user_id") for row in rows}:
+        _invalidate_cached_lead_count(user_id)
+    logger.info(f"Bulk created {len(created)} of {len(rows)} lead record(s)")
+    return created
 
 
 def update_lead_record(
@@ -84,12 +160,19 @@ def update_lead_record(
     except Exception as e:
         logger.exception(f"Database error updating lead record {local_lead_id}: {e}")
         return None  # Indicate failure
+    finally:
+        _invalidate_cached_lead(local_lead_id)
 
 
 def get_lead_record_by_local_id(
     db: Client, local_lead_id: str
 ) -> Optional[Dict[str, Any]]:
-    """Gets a lead record from Supabase by its internal ID."""
+    """Gets a lead record from Supabase by its internal ID (briefly cached)."""
+    with _lead_cache_lock:
+        cached = _lead_cache.get(local_lead_id)
+    if cached is not None:
+        return cached
+
     logger.debug(f"Fetching lead record by local id: {local_lead_id}")
     try:
         # maybe_single returns dict directly if found, None otherwise
@@ -102,6 +185,8 @@ def get_lead_record_by_local_id(
         )
         if response and response.data:
             logger.debug(f"Found lead record: {local_lead_id}")
+            with _lead_cache_lock:
+                _lead_cache[local_lead_id] = response.data
             return response.data
         else:
             logger.debug(f"Lead record not found: {local_lead_id}")
@@ -109,3 +194,91 @@ def get_lead_record_by_local_id(
     except Exception as e:
         logger.exception(f"Database error fetching lead record {local_lead_id}: {e}")
         return None  # Indicate failure
+
+
+def get_lead_records_by_local_ids(
+    db: Client, local_lead_ids: List[str]
+) -> Optional[Dict[str, Optional[Dict[str, Any]]]]:
+    """
+    Gets many lead records by internal ID with one `in.(...)` query per chunk of
+    IN_QUERY_CHUNK_SIZE IDs. Returns a dict keyed by ID, with None for IDs that
+    matched no row, or None if any query failed.
+    """
+    unique_ids = list(dict.fromkeys(local_lead_ids))
+    records: Dict[str, Optional[Dict[str, Any]]] = dict.fromkeys(unique_ids)
+    logger.debug(f"Fetching {len(unique_ids)} lead record(s) by local id")
+    try:
+        for start in range(0, len(unique_ids), IN_QUERY_CHUNK_SIZE):
+            chunk = unique_ids[start : start + IN_QUERY_CHUNK_SIZE]
+            response = db.table("leads").select("*").in_("id", chunk).execute()
+            for row in response.data or []:
+                records[str(row.get("id"))] = row
+    except Exception as e:
+        logger.exception(f"Database error fetching lead records by local id: {e}")
+        return None  # Indicate failure
+
+    with _lead_cache_lock:
+        for local_lead_id, record in records.items():
+            if record is not None:
+                _lead_cache[local_lead_id] = record
+    return records
+
+
+def get_lead_records_for_user(
+    db: Client,
+    user_id: str,
+    *,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[Tuple[datetime, uuid.UUID]] = None,
+) -> Optional[Tuple[List[Dict[str, Any]], int, Optional[Tuple[str, str]]]]:
+    """
+    Gets a page of a user's lead records, newest first, together with the total count
+    and the cursor for the next page. `count="exact"` makes PostgREST return the total
+    alongside the rows, so the page and the count come back in a single round-trip;
+    the total is then cached for a short while so further page turns skip the count.
+
+    With a `(created_at, id)` cursor from the previous page the page is seeked
+    (keyset pagination): Postgres walks the (user_id, created_at, id) index from the
+    cursor instead of scanning and discarding `skip` rows, so deep pages cost the same
+    as the first. `skip` is only applied when no cursor is given.
+    """
+    logger.debug(
+        f"Fetching lead records for user {user_id} (skip={skip}, limit={limit}, cursor={cursor})"
+    )
+    with _lead_cache_lock:
+        cached_total = _lead_count_cache.get(user_id)
+    try:
+        query = (
+            db.table("leads")
+            # Only ask PostgREST to count when the total isn't cached
+            .select("*", count=None if cached_total is not None else "exact")
+            .eq("user_id", user_id)
+            .order("created_at", desc=True)
+            .order("id", desc=True)  # Tie-breaker so the ordering (and cursor) is total
+        )
+        if cursor:
+            # Re-serialized from the typed values, never the raw client strings
+            created_at, last_id = cursor[0].isoformat(), str(cursor[1])
+            query = query.or_(
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt."{last_id}")'
+            ).limit(limit)
+        else:
+            query = query.range(skip, skip + limit - 1)
+        response = query.execute()
+    except Exception as e:
+        logger.exception(f"Database error listing lead records for user {user_id}: {e}")
+        return None  # Indicate failure
+
+    rows = response.data or []
+    if cached_total is not None:
+        total = cached_total
+    else:
+        total = response.count or 0
+        with _lead_cache_lock:
+            _lead_count_cache[user_id] = total
+    next_cursor = None
+    if len(rows) == limit and rows[-1].get("created_at") and rows[-1].get("id"):
+        next_cursor = (str(rows[-1]["created_at"]), str(rows[-1]["id"]))
+    return rows, total, next_cursor
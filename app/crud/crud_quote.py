@@ -1,25 +1,65 @@
 import logging
 from supabase import Client
 from app.schemas import quote as quote_schema  # Use alias
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
+import threading
 import uuid
 
+from cachetools import TTLCache
+
 # from postgrest.exceptions import APIError # Import specific Supabase errors if needed
 
 logger = logging.getLogger(__name__)
 
+# Rows per insert request in the bulk create helpers; keeps request bodies well under
+# PostgREST/proxy payload limits
+BULK_INSERT_CHUNK_SIZE = 1000
+# IDs per `in.(...)` filter in the batch getters; keeps the query string well under
+# PostgREST/proxy URL length limits
+IN_QUERY_CHUNK_SIZE = 200
+
 # Assume 'quotes' table exists matching QuoteRecord schema
 
+# Short-lived cache of quote records by local ID, invalidated on update. Guarded by a
+# lock because CRUD functions are also called from worker threads.
+_quote_cache: TTLCache = TTLCache(maxsize=5000, ttl=15)
+_quote_cache_lock = threading.Lock()
+
+# Quote records by Pineapple Quote ID, for status polling. Rows rarely change, so they
+# live longer; the local ID -> Pineapple ID index lets updates (keyed by local ID)
+# evict them. Both are guarded by _quote_cache_lock.
+_pineapple_quote_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_pineapple_ids_by_local_id: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+
+def _invalidate_cached_quote(
+    local_quote_id: str, pineapple_quote_id: Optional[str] = None
+) -> None:
+    with _quote_cache_lock:
+        _quote_cache.pop(local_quote_id, None)
+        indexed_pineapple_id = _pineapple_ids_by_local_id.pop(local_quote_id, None)
+        if indexed_pineapple_id:
+            _pineapple_quote_cache.pop(indexed_pineapple_id, None)
+        if pineapple_quote_id:
+            _pineapple_quote_cache.pop(pineapple_quote_id, None)
+
 
 def create_quote_record(
-    db: Client, *, quote_in: quote_schema.QuoteRecordCreate
+    db: Client, *, quote_in: Union[quote_schema.QuoteRecordCreate, Dict[str, Any]]
 ) -> Optional[Dict[str, Any]]:
-    """Creates a quote record in Supabase 'quotes' table."""
-    if not quote_in.id:  # Generate UUID if not provided during creation
-        quote_in.id = str(uuid.uuid4())
-
-    # Use model_dump for Pydantic V2
-    quote_data = quote_in.model_dump()
+    """
+    Creates a quote record in Supabase 'quotes' table. Internal callers that build the
+    row themselves may pass a plain dict, which is inserted as-is (skipping model
+    validation and model_dump); a missing ID is generated in place.
+    """
+    if isinstance(quote_in, dict):
+        quote_data = quote_in
+        if not quote_data.get("id"):
+            quote_data["id"] = str(uuid.uuid4())
+    else:
+        if not quote_in.id:  # Generate UUID if not provided during creation
+            quote_in.id = str(uuid.uuid4())
+        quote_data = quote_in.model_dump()
     log_ref_id = quote_data.get("id", "N/A")
     log_ref_user = quote_data.get("user_id", "N/A")
     logger.info(
@@ -27,8 +67,9 @@ def create_quote_record(
     )
 
     try:
-        # Check supabase-py docs for exact syntax V2+ (insert might take dict)
-        response = db.table("quotes").insert(quote_data).execute()
+        response = (
+            db.table("quotes").insert(quote_data, returning="representation").execute()
+        )
 
         if response.data:
             logger.info(
@@ -39,13 +80,45 @@ def create_quote_record(
             logger.warning(
                 f"Supabase insert for quote {log_ref_id} returned no data. Response: {response}"
             )
-            # RLS might prevent returning data, try fetching if critical
-            return get_quote_record_by_local_id(db, str(log_ref_id))
+            # RLS may hide the returned row; the payload already carries the generated ID,
+            # so return it rather than paying for a second round-trip to re-select it
+            return quote_data
     except Exception as e:  # Catch potential PostgrestAPIError etc.
         logger.exception(f"Database error creating quote record id {log_ref_id}: {e}")
         return None  # Indicate failure
 
 
+def create_quote_records_bulk(
+    db: Client, *, quotes_in: List[quote_schema.QuoteRecordCreate]
+) -> List[Dict[str, Any]]:
+    """
+    Creates many quote records with one insert request per chunk of
+    BULK_INSERT_CHUNK_SIZE rows, instead of one PostgREST round-trip per row.
+    Returns the created rows in input order; a failed chunk is logged and stops the
+    batch, so a shorter result means only the leading rows were stored.
+    """
+    for quote_in in quotes_in:
+        if not quote_in.id:  # Generate UUIDs up front so rows can be correlated
+            quote_in.id = str(uuid.uuid4())
+    rows = [quote_in.model_dump() for quote_in in quotes_in]
+    logger.info(f"Attempting to bulk create {len(rows)} quote record(s)")
+
+    created: List[Dict[str, Any]] = []
+    for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+        chunk = rows[start : start + BULK_INSERT_CHUNK_SIZE]
+        try:
+            response = db.table("quotes").insert(chunk).execute()
+        except Exception as e:
+            logger.exception(
+                f"Database error bulk creating quote records {start}-{start + len(chunk) - 1}: {e}"
+            )
+            break
+        # RLS may prevent returning rows; the inserted payload carries the same IDs
+        created.extend(response.data or chunk)
+    logger.info(f"Bulk created {len(created)} of {len(rows)} quote record(s)")
+    return created
+
+
 def update_quote_record(
     db: Client,
     *,
@@ -84,12 +157,21 @@ def update_quote_record(
     except Exception as e:
         logger.exception(f"Database error updating quote record {local_quote_id}: {e}")
         return None  # Indicate failure
+    finally:
+        _invalidate_cached_quote(
+            local_quote_id, update_payload.get("pineapple_quote_id")
+        )
 
 
 def get_quote_record_by_local_id(
     db: Client, local_quote_id: str
 ) -> Optional[Dict[str, Any]]:
-    """Gets a quote record from Supabase by its internal ID."""
+    """Gets a quote record from Supabase by its internal ID (briefly cached)."""
+    with _quote_cache_lock:
+        cached = _quote_cache.get(local_quote_id)
+    if cached is not None:
+        return cached
+
     logger.debug(f"Fetching quote record by local id: {local_quote_id}")
     try:
         # maybe_single returns dict directly if found, None otherwise
@@ -102,6 +184,8 @@ def get_quote_record_by_local_id(
         )
         if response and response.data:
             logger.debug(f"Found quote record: {local_quote_id}")
+            with _quote_cache_lock:
+                _quote_cache[local_quote_id] = response.data
             return response.data
         else:
             logger.debug(f"Quote record not found: {local_quote_id}")
@@ -111,10 +195,58 @@ def get_quote_record_by_local_id(
         return None  # Indicate failure
 
 
+def _get_quote_records_by_column(
+    db: Client, column: str, ids: List[str]
+) -> Optional[Dict[str, Optional[Dict[str, Any]]]]:
+    """
+    Fetches quote records whose `column` is in `ids` with one `in.(...)` query per
+    chunk of IN_QUERY_CHUNK_SIZE IDs. Returns a dict keyed by ID, with None for IDs
+    that matched no row, or None if any query failed.
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    records: Dict[str, Optional[Dict[str, Any]]] = dict.fromkeys(unique_ids)
+    logger.debug(f"Fetching {len(unique_ids)} quote record(s) by {column}")
+    try:
+        for start in range(0, len(unique_ids), IN_QUERY_CHUNK_SIZE):
+            chunk = unique_ids[start : start + IN_QUERY_CHUNK_SIZE]
+            response = db.table("quotes").select("*").in_(column, chunk).execute()
+            for row in response.data or []:
+                records[str(row.get(column))] = row
+    except Exception as e:
+        logger.exception(f"Database error fetching quote records by {column}: {e}")
+        return None  # Indicate failure
+    return records
+
+
+def get_quote_records_by_local_ids(
+    db: Client, local_quote_ids: List[str]
+) -> Optional[Dict[str, Optional[Dict[str, Any]]]]:
+    """Gets many quote records by internal ID, batched into `in.(...)` queries."""
+    records = _get_quote_records_by_column(db, "id", local_quote_ids)
+    if records:
+        with _quote_cache_lock:
+            for local_quote_id, record in records.items():
+                if record is not None:
+                    _quote_cache[local_quote_id] = record
+    return records
+
+
+def get_quote_records_by_pineapple_ids(
+    db: Client, pineapple_quote_ids: List[str]
+) -> Optional[Dict[str, Optional[Dict[str, Any]]]]:
+    """Gets many quote records by Pineapple Quote ID, batched into `in.(...)` queries."""
+    return _get_quote_records_by_column(db, "pineapple_quote_id", pineapple_quote_ids)
+
+
 def get_quote_record_by_pineapple_id(
     db: Client, pineapple_quote_id: str
 ) -> Optional[Dict[str, Any]]:
-    """Gets a quote record from Supabase by the Pineapple Quote ID."""
+    """Gets a quote record from Supabase by the Pineapple Quote ID (cached for 60s)."""
+    with _quote_cache_lock:
+        cached = _pineapple_quote_cache.get(pineapple_quote_id)
+    if cached is not None:
+        return cached
+
     logger.debug(f"Fetching quote record by pineapple_quote_id: {pineapple_quote_id}")
     try:
         response = (
@@ -128,6 +260,11 @@ def get_quote_record_by_pineapple_id(
             logger.debug(
                 f"Found quote record with pineapple_quote_id: {pineapple_quote_id}"
             )
+            with _quote_cache_lock:
+                _pineapple_quote_cache[pineapple_quote_id] = response.data
+                local_quote_id = response.data.get("id")
+                if local_quote_id:
+                    _pineapple_ids_by_local_id[str(local_quote_id)] = pineapple_quote_id
             return response.data
         else:
             logger.debug(
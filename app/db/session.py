@@ -1,15 +1,25 @@
+import asyncio
 import logging
+import threading
+
 from supabase import create_client, Client
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 supabase_client: Client | None = None
+_supabase_client_lock = threading.Lock()
 
 
 def get_supabase_client() -> Client:
     """Initializes and returns the Supabase client (lazy initialization)."""
     global supabase_client
-    if supabase_client is None:
+    if supabase_client is not None:
+        return supabase_client
+    # Double-checked: concurrent first callers (worker threads via asyncio.to_thread)
+    # must not each construct their own client
+    with _supabase_client_lock:
+        if supabase_client is not None:
+            return supabase_client
         if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
             logger.critical("Supabase URL or Key not configured!")
             raise ConnectionError("Supabase URL or Key not configured.")
@@ -21,38 +31,65 @@ def get_supabase_client() -> Client:
                 settings.SUPABASE_URL, settings.SUPABASE_KEY
             )
             logger.info("Supabase client initialized successfully.")
-
-            # Test the connection by making a simple query
-            try:
-                # Try to fetch one row from the users table as a test
-                test_result = (
-                    supabase_client.table("users").select("id").limit(1).execute()
-                )
-                if test_result.data is not None:
-                    logger.info(
-                        "Supabase connection test successful - users table is accessible."
-                    )
-                else:
-                    logger.warning(
-                        "Supabase connection test completed but returned no data."
-                    )
-            except Exception as test_e:
-                logger.warning(f"Supabase connection test failed: {test_e}")
-                # Don't raise here, just log the warning
-
         except Exception as e:
             logger.exception("Error initializing Supabase client!")
             raise ConnectionError(f"Could not connect to Supabase: {e}") from e
     return supabase_client
 
 
-# Dependency for FastAPI
-def get_db():
-    """FastAPI dependency to get Supabase client."""
+def check_supabase_connection() -> None:
+    """
+    Runs a one-row test query against Supabase and logs the outcome. Called once at
+    startup rather than during lazy initialization, so a request that happens to
+    create the client never pays for the extra round-trip.
+    """
     try:
-        client = get_supabase_client()
-        yield client
+        # Try to fetch one row from the users table as a test
+        test_result = (
+            get_supabase_client().table("users").select("id").limit(1).execute()
+        )
+        if test_result.data is not None:
+            logger.info(
+                "Supabase connection test successful - users table is accessible."
+            )
+        else:
+            logger.warning("Supabase connection test completed but returned no data.")
+    except Exception as test_e:
+        logger.warning(f"Supabase connection test failed: {test_e}")
+        # Don't raise here, just log the warning
+
+
+def close_supabase_client() -> None:
+    """Closes the shared client's pooled HTTP connections (called on app shutdown)."""
+    global supabase_client
+    if supabase_client is None:
+        return
+    try:
+        supabase_client.postgrest.aclose()  # Sync client; closes its httpx session
+        supabase_client.auth.close()
+        logger.info("Supabase client connections closed.")
     except Exception as e:
-        logger.exception("Error occurred within Supabase client request context.")
+        logger.warning(f"Error closing Supabase client connections: {e}")
+    finally:
+        supabase_client = None
+
+
+# Dependency for FastAPI
+async def get_db() -> Client:
+    """
+    FastAPI dependency to get Supabase client.
+
+    Declared `async` (and not as a generator) because FastAPI runs sync dependencies,
+    and both halves of sync generator dependencies, in its threadpool; this one sits
+    on every authenticated request, and the client is normally ready from startup.
+    """
+    if supabase_client is not None:
+        return supabase_client
+    try:
+        # Not initialized at startup (e.g. Supabase was misconfigured): building the
+        # client sets up its HTTP sessions, so keep it off the event loop
+        return await asyncio.to_thread(get_supabase_client)
+    except Exception:
+        logger.exception("Error obtaining Supabase client for request.")
         # Re-raise for FastAPI's exception handling
         raise
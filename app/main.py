@@ -1,9 +1,17 @@
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 import httpx
+import orjson
 from fastapi import FastAPI, Request, status, APIRouter
+from fastapi.openapi.docs import (
+    get_redoc_html,
+    get_swagger_ui_html,
+    get_swagger_ui_oauth2_redirect_html,
+)
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import JSONResponse
 
 
 from slowapi.errors import RateLimitExceeded
@@ -15,7 +23,12 @@ from app.core.rate_limiter import limiter
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.core.logging_config import setup_logging
-
+from app.services.pineapple_api import (
+    PINEAPPLE_HEADERS,
+    PineappleAPIError,
+    PineappleAPIService,
+    check_token_expiry,
+)
 
 setup_logging(log_level_str=settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
@@ -68,51 +81,87 @@ async def lifespan(app: FastAPI):
 
     logger.info(f"Starting up {settings.PROJECT_NAME}...")
 
-    headers = {
-        "Authorization": (
-            f"Bearer {settings.PINEAPPLE_API_TOKEN}"
-            if settings.PINEAPPLE_API_TOKEN
-            else ""
-        ),
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-    }
+    # Supabase CRUD runs on the sync client via asyncio.to_thread, so the default
+    # executor's size (min(32, cpu + 4)) would cap concurrent PostgREST round-trips.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(
+            max_workers=settings.DB_THREADPOOL_SIZE, thread_name_prefix="supabase"
+        )
+    )
 
+    check_token_expiry()
+    headers = {**PINEAPPLE_HEADERS, "Accept": "application/json"}
+
+    # One long-lived client for all Pineapple calls; pooled keep-alive connections
+    # avoid a fresh TCP/TLS handshake per request, and over HTTPS concurrent calls
+    # are multiplexed as HTTP/2 streams on a shared connection.
     timeout = httpx.Timeout(25.0, connect=5.0)
-    transport = httpx.AsyncHTTPTransport(retries=1)
+    limits = httpx.Limits(
+        max_connections=100, max_keepalive_connections=32, keepalive_expiry=60.0
+    )
+    transport = httpx.AsyncHTTPTransport(retries=1, limits=limits, http2=True)
+
+    # The logging hooks rebuild a masked copy of the headers for every request, so
+    # only attach them when their DEBUG output would actually be emitted
+    event_hooks = (
+        {"request": [log_request_hook], "response": [log_response_hook]}
+        if settings.LOG_LEVEL == "DEBUG"
+        else {}
+    )
 
     app.state.pineapple_client = httpx.AsyncClient(
         base_url=settings.PINEAPPLE_API_URL,
         headers=headers,
         timeout=timeout,
         transport=transport,
-        event_hooks={
-            "request": [log_request_hook],
-            "response": [log_response_hook],
-        },
+        event_hooks=event_hooks,
     )
     logger.info(
         f"Pineapple HTTP client initialized for base URL: {settings.PINEAPPLE_API_URL}"
     )
 
-    try:
-        from app.db.session import get_supabase_client
+    app.state.pineapple_service = PineappleAPIService(app.state.pineapple_client)
+
+    from app.services.lead_transfer_queue import LeadTransferQueue
+
+    app.state.lead_transfer_queue = LeadTransferQueue(app.state.pineapple_client)
+    app.state.lead_transfer_queue.start()
+
+    from app.db.session import check_supabase_connection, close_supabase_client
+    from app.api.deps import warm_jwks_cache
 
-        get_supabase_client()
-    except Exception as e:
-        logger.critical(f"Failed to initialize Supabase client on startup: {e}")
+    async def init_supabase():
+        try:
+            # Creates the client and runs its connection test query, both blocking
+            await asyncio.to_thread(check_supabase_connection)
+        except Exception as e:
+            logger.critical(f"Failed to initialize Supabase client on startup: {e}")
+
+    # Both one-off startup fetches are independent round-trips to Supabase; overlap
+    # them so boot waits for the slower one rather than their sum. The JWKS is warmed
+    # here rather than on the first request.
+    await asyncio.gather(init_supabase(), warm_jwks_cache())
 
     yield
 
     logger.info("Shutting down...")
+    if hasattr(app.state, "lead_transfer_queue"):
+        await app.state.lead_transfer_queue.stop()
     if hasattr(app.state, "pineapple_client") and app.state.pineapple_client:
         await app.state.pineapple_client.aclose()
         logger.info("Pineapple HTTP client closed.")
+    close_supabase_client()
 
 
+OPENAPI_URL = f"{settings.API_V1_STR}/openapi.json"
+
+# The schema and docs routes are registered below rather than by FastAPI, so
+# openapi.json can be served from pre-encoded bytes
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
     lifespan=lifespan,
     description="API for creating insurance quotes and leads via Pineapple integration, with Supabase storage and auth.",
     version="2.0.0",
@@ -126,16 +175,17 @@ app.add_middleware(SlowAPIMiddleware)
 logger.info(f"Configuring CORS for origins: {settings.BACKEND_CORS_ORIGINS}")
 
 
-origins = []
+# A frozenset: CORSMiddleware checks `origin in allow_origins` on every request
+origins = frozenset()
 if settings.BACKEND_CORS_ORIGINS == "*":
-    origins = ["*"]
+    origins = frozenset(["*"])
 else:
 
-    origins = [
+    origins = frozenset(
         origin.strip()
         for origin in settings.BACKEND_CORS_ORIGINS.split(",")
         if origin.strip()
-    ]
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -154,14 +204,35 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     )
 
 
+@app.exception_handler(PineappleAPIError)
+async def upstream_exception_handler(request: Request, exc: PineappleAPIError):
+    # Single mapping for failed calls to the Pineapple API, so handlers need no try/except.
+    # Only Pineapple failures land here (Supabase's httpx errors stay 500s), and the
+    # detail, which can include upstream URLs, is logged rather than returned.
+    logger.error(
+        f"External API error for request {request.method} {request.url.path}: {exc}"
+    )
+    return JSONResponse(
+        status_code=status.HTTP_502_BAD_GATEWAY,
+        content={"detail": "External provider request failed."},
+    )
+
+
+# The generic 500 body never varies, so it is serialized once
+_INTERNAL_ERROR_BODY = orjson.dumps(
+    {"detail": "An unexpected internal server error occurred."}
+)
+
+
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
     logger.exception(
         f"Unhandled exception for request {request.method} {request.url}: {exc}"
     )
-    return JSONResponse(
+    return Response(
+        content=_INTERNAL_ERROR_BODY,
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content={"detail": "An unexpected internal server error occurred."},
+        media_type="application/json",
     )
 
 
@@ -174,13 +245,66 @@ else:
     logger.warning("Pineapple routes were not added to the application")
 
 
+# Invariant payload, built once rather than on every (frequent) container health probe
+_ROOT_RESPONSE = {"message": f"Welcome to {settings.PROJECT_NAME}", "status": "healthy"}
+
+
 @app.get("/", tags=["Health"], summary="API Root/Health Check")
 async def read_root(request: Request):
     """Basic health check endpoint. Confirms the API is running."""
 
-    client_host = request.headers.get(
-        "x-forwarded-for", request.client.host if request.client else "Unknown"
+    if logger.isEnabledFor(logging.DEBUG):
+        client_host = request.headers.get(
+            "x-forwarded-for", request.client.host if request.client else "Unknown"
+        )
+        logger.debug(f"Root endpoint '/' accessed by {client_host}")
+
+    return _ROOT_RESPONSE
+
+
+# FastAPI memoizes the OpenAPI dict but its own route re-encodes it on every fetch of
+# openapi.json (each Swagger/ReDoc load). This route serves the encoded bytes instead,
+# built once per root_path on first request (after all routers are included).
+_openapi_bodies: dict[str, bytes] = {}
+
+
+@app.get(OPENAPI_URL, include_in_schema=False)
+async def openapi_json(request: Request) -> Response:
+    root_path = request.scope.get("root_path", "").rstrip("/")
+    body = _openapi_bodies.get(root_path)
+    if body is None:
+        schema = app.openapi()
+        if root_path and app.root_path_in_servers:
+            server_urls = {s.get("url") for s in schema.get("servers", [])}
+            if root_path not in server_urls:
+                schema = {
+                    **schema,
+                    "servers": [{"url": root_path}, *schema.get("servers", [])],
+                }
+        body = _openapi_bodies[root_path] = orjson.dumps(schema)
+    return Response(content=body, media_type="application/json")
+
+
+@app.get("/docs", include_in_schema=False)
+async def swagger_ui_html(request: Request) -> HTMLResponse:
+    root_path = request.scope.get("root_path", "").rstrip("/")
+    return get_swagger_ui_html(
+        openapi_url=root_path + OPENAPI_URL,
+        title=f"{app.title} - Swagger UI",
+        oauth2_redirect_url=root_path + app.swagger_ui_oauth2_redirect_url,
+        init_oauth=app.swagger_ui_init_oauth,
+        swagger_ui_parameters=app.swagger_ui_parameters,
     )
-    logger.info(f"Root endpoint '/' accessed by {client_host}")
 
-    return {"message": f"Welcome to {settings.PROJECT_NAME}", "status": "healthy"}
+
+@app.get(app.swagger_ui_oauth2_redirect_url, include_in_schema=False)
+async def swagger_ui_redirect() -> HTMLResponse:
+    return get_swagger_ui_oauth2_redirect_html()
+
+
+@app.get("/redoc", include_in_schema=False)
+async def redoc_html(request: Request) -> HTMLResponse:
+    root_path = request.scope.get("root_path", "").rstrip("/")
+    return get_redoc_html(
+        openapi_url=root_path + OPENAPI_URL, title=f"{app.title} - ReDoc"
+    )
@@ -3,11 +3,12 @@ from datetime import datetime
 from sqlalchemy import (
     Boolean,
     Column,
+    Date,
     Integer,
     String,
     Numeric,
-    DateTime,
     ForeignKey,
+    Index,
     JSON,
     Text,
     TIMESTAMP,
@@ -67,8 +68,8 @@ class Driver(Base):
     mobile_number = Column(String, nullable=True)
     id_number = Column(String, nullable=True)
     prv_ins_losses = Column(Integer, nullable=True)
-    license_issue_date = Column(DateTime, nullable=True)  # Use DateTime for date
-    date_of_birth = Column(DateTime, nullable=True)  # Use DateTime for date
+    license_issue_date = Column(Date, nullable=True)  # Native DATE, as in the migration
+    date_of_birth = Column(Date, nullable=True)  # Native DATE, as in the migration
 
     # Relationship
     vehicle = relationship("Vehicle", back_populates="driver")
@@ -137,6 +138,16 @@ class Lead(Base):
     quote_id = Column(UUID(as_uuid=True), ForeignKey("quotes.id"), nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), nullable=True)
 
+    __table_args__ = (
+        # Per-user listing ordered by newest first; id breaks ties for keyset paging
+        Index(
+            "ix_leads_user_id_created_at_id",
+            "user_id",
+            created_at.desc(),
+            id.desc(),
+        ),
+    )
+
     # Relationships
     user = relationship("User", back_populates="leads")
     quote = relationship("Quote", back_populates="leads")
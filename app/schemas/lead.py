@@ -9,6 +9,7 @@ from pydantic import (
     field_validator,
     model_validator,
     FieldValidationInfo,
+    TypeAdapter,
 )  # V2 validators
 from typing import Optional, List, Dict, Any
 from datetime import datetime  # Added datetime
@@ -130,3 +131,18 @@ class LeadRecord(LeadRecordBase):
     error_message: Optional[str] = None
     created_at: Optional[datetime] = None  # Timestamps from Supabase
     updated_at: Optional[datetime] = None
+
+
+# Validates a page of DB rows in one call into pydantic-core
+LeadRecordList = TypeAdapter(List[LeadRecord])
+
+
+class LeadRecordPage(BaseModel):
+    # Paginated lead records returned by our API
+    items: List[LeadRecord]
+    total: int = Field(..., description="Total records matching the query")
+    skip: int
+    limit: int
+    next_cursor: Optional[str] = Field(
+        None, description="Opaque cursor for the next page; absent on the last page"
+    )
@@ -1,5 +1,6 @@
 from pydantic import (
     BaseModel,
+    TypeAdapter,
     Field,
     EmailStr,
     ConfigDict,
@@ -160,6 +161,10 @@ class QuoteResponseData(BaseModel):
     excess: float
 
 
+# Validates a whole list of provider quote items in one call into pydantic-core
+QuoteResponseDataList = TypeAdapter(List[QuoteResponseData])
+
+
 class QuoteResponse(BaseModel):
     # Overall response from *our* API
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+from pydantic import ValidationError
+
+from app.crud import crud_lead
+from app.db.session import get_supabase_client
+from app.schemas import lead as lead_schema
+from app.services.pineapple_api import transfer_lead
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKER_COUNT = 4
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_MAX_QUEUED = 1000  # Submissions beyond this are refused rather than buffered
+RETRY_BACKOFF_SECONDS = 5.0
+
+
+@dataclass
+class LeadTransferJob:
+    """A lead already persisted locally, waiting to be sent to Pineapple."""
+
+    local_lead_id: str
+    payload: Dict[str, Any]
+    attempts: int = 0
+
+
+class LeadTransferQueue:
+    """
+    Decouples lead submission from the Pineapple round-trip.
+
+    Handlers `submit()` jobs and return immediately; worker tasks drain the queue in
+    batches and send each batch concurrently over the shared HTTP client. Failed jobs
+    are put back on the queue after a linear backoff, then marked `failed_transfer`.
+    The queue is bounded (`submit()` raises `asyncio.QueueFull` when it is full), and
+    jobs still unfinished at shutdown are marked `failed_transfer` so their records
+    don't stay `pending_transfer`.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        workers: int = DEFAULT_WORKER_COUNT,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+    ):
+        self.client = client
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._queue: asyncio.Queue[LeadTransferJob] = asyncio.Queue(maxsize=max_queued)
+        self._tasks: List[asyncio.Task] = []
+        # Backoff timers for failed jobs; they hold no worker while waiting
+        self._retry_tasks: Set[asyncio.Task] = set()
+        # Every accepted job whose outcome hasn't been stored yet, by local lead ID
+        self._unfinished: Dict[str, LeadTransferJob] = {}
+
+    def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"lead-transfer-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Lead transfer queue started with {self.workers} worker(s).")
+
+    async def stop(self) -> None:
+        tasks = [*self._tasks, *self._retry_tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        unfinished = list(self._unfinished.values())
+        self._unfinished.clear()
+        if not unfinished:
+            return
+        logger.warning(
+            f"Lead transfer queue stopped with {len(unfinished)} job(s) unfinished; marking them failed_transfer."
+        )
+        update = lead_schema.LeadRecordUpdate(
+            status="failed_transfer",
+            error_message="Transfer interrupted by server shutdown.",
+        )
+        results = await asyncio.gather(
+            *(self._store_update(job, update) for job in unfinished),
+            return_exceptions=True,
+        )
+        for job, result in zip(unfinished, results):
+            if isinstance(result, BaseException):
+                logger.error(
+                    f"Could not mark lead {job.local_lead_id} as failed on shutdown: {result}"
+                )
+
+    def full(self) -> bool:
+        return self._queue.full()
+
+    def submit(self, job: LeadTransferJob) -> None:
+        """Queues a job; raises `asyncio.QueueFull` if the queue is at capacity."""
+        self._queue.put_nowait(job)
+        self._unfinished[job.local_lead_id] = job
+
+    async def _next_batch(self) -> List[LeadTransferJob]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _worker(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            results = await asyncio.gather(
+                *(transfer_lead(dict(job.payload), self.client) for job in batch),
+                return_exceptions=True,
+            )
+            outcomes = await asyncio.gather(
+                *(self._complete(job, result) for job, result in zip(batch, results)),
+                return_exceptions=True,
+            )
+            for job, outcome in zip(batch, outcomes):
+                if isinstance(outcome, BaseException):
+                    logger.error(
+                        f"Could not record transfer outcome for lead {job.local_lead_id}: {outcome}",
+                        exc_info=outcome,
+                    )
+            for _ in batch:
+                self._queue.task_done()
+
+    def _schedule_retry(self, job: LeadTransferJob, delay: float) -> None:
+        task = asyncio.create_task(self._requeue_after(job, delay))
+        self._retry_tasks.add(task)
+        task.add_done_callback(self._retry_tasks.discard)
+
+    async def _requeue_after(self, job: LeadTransferJob, delay: float) -> None:
+        await asyncio.sleep(delay)
+        # Waits for space instead of dropping an already-accepted job
+        await self._queue.put(job)
+
+    async def _complete(self, job: LeadTransferJob, result: Any) -> None:
+        job.attempts += 1
+        if isinstance(result, BaseException):
+            if job.attempts < self.max_attempts:
+                self._schedule_retry(job, RETRY_BACKOFF_SECONDS * job.attempts)
+                logger.warning(
+                    f"Lead {job.local_lead_id} transfer attempt {job.attempts} failed, will retry: {result}"
+                )
+                return
+            logger.error(
+                f"Lead {job.local_lead_id} transfer failed after {job.attempts} attempt(s): {result}"
+            )
+            update = lead_schema.LeadRecordUpdate(
+                status="failed_transfer", error_message=str(result)
+            )
+        else:
+            update = self._transfer_update(job, result)
+        try:
+            await self._store_update(job, update)
+        finally:
+            self._unfinished.pop(job.local_lead_id, None)
+
+    @staticmethod
+    async def _store_update(
+        job: LeadTransferJob, update: lead_schema.LeadRecordUpdate
+    ) -> None:
+        updated = await asyncio.to_thread(
+            crud_lead.update_lead_record,
+            get_supabase_client(),
+            local_lead_id=job.local_lead_id,
+            lead_update_data=update,
+        )
+        if updated is None:
+            logger.error(
+                f"Lead {job.local_lead_id} transfer outcome '{update.status}' could not be stored"
+            )
+
+    @staticmethod
+    def _transfer_update(
+        job: LeadTransferJob, result: Any
+    ) -> lead_schema.LeadRecordUpdate:
+        try:
+            response = lead_schema.PineappleLeadTransferResponse.model_validate(result)
+        except ValidationError as e:
+            # An unexpected body must still settle the record, not leave it pending
+            logger.error(
+                f"Lead {job.local_lead_id} transfer returned an unexpected response: {e}"
+            )
+            return lead_schema.LeadRecordUpdate(
+                status="failed_transfer",
+                transfer_response=result if isinstance(result, dict) else None,
+                error_message="Unexpected response from Pineapple lead transfer.",
+            )
+        data: Optional[lead_schema.PineappleLeadTransferData] = response.data
+        return lead_schema.LeadRecordUpdate(
+            status="transferred" if response.success else "failed_transfer",
+            pineapple_lead_uuid=data.uuid if data else None,
+            pineapple_redirect_url=data.redirect_url if data else None,
+            transfer_response=result,
+            error_message=None if response.success else response.message,
+        )
@@ -1,7 +1,11 @@
 import os
-import requests
+import time
+import httpx
+import orjson
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Union
+from jose import JWTError, jwt
+from pydantic import BaseModel
 from app.core.config import settings  # Import settings directly
 
 logger = logging.getLogger(__name__)
@@ -30,85 +34,148 @@ def _get_headers() -> Dict[str, str]:
     }
 
 
-def get_quick_quote(quote_data: Dict[str, Any]) -> Dict[str, Any]:
+# Token and endpoints are static for the process lifetime, so build the headers once.
+# Also used as the default headers of the shared client created in the app lifespan.
+PINEAPPLE_HEADERS = _get_headers()
+
+TOKEN_EXPIRY_WARNING_SECONDS = 24 * 60 * 60
+
+
+class PineappleAPIError(Exception):
+    """A call to the Pineapple API failed (transport error, error status or bad body)."""
+
+
+def get_token_expiry() -> Optional[float]:
+    """Returns the `exp` (epoch seconds) of the Pineapple token if it is a JWT, else None."""
+    token = PINEAPPLE_HEADERS["Authorization"].split(" ", 1)[-1]
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return None  # Opaque API key; nothing to track
+    return float(exp) if exp is not None else None
+
+
+def check_token_expiry() -> None:
+    """Logs at startup if the configured Pineapple token is expired or about to expire."""
+    exp = get_token_expiry()
+    if exp is None:
+        return
+    remaining = exp - time.time()
+    if remaining <= 0:
+        logger.error(
+            "PINEAPPLE_API_TOKEN has expired; Pineapple calls will be rejected."
+        )
+    elif remaining < TOKEN_EXPIRY_WARNING_SECONDS:
+        logger.warning(
+            f"PINEAPPLE_API_TOKEN expires in {int(remaining // 60)} minutes; rotate it soon."
+        )
+
+
+def _encode_body(data: Union[Dict[str, Any], BaseModel]) -> bytes:
+    """
+    Serializes a request body for Pineapple.
+
+    Models go straight through pydantic-core's JSON serializer (they already carry
+    `source`); plain dicts get the default source and are encoded with orjson.
+    """
+    if isinstance(data, BaseModel):
+        return data.model_dump_json().encode()
+    if "source" not in data:
+        data["source"] = PINEAPPLE_SOURCE_NAME
+    return orjson.dumps(data)
+
+
+async def get_quick_quote(
+    quote_data: Union[Dict[str, Any], BaseModel], client: httpx.AsyncClient
+) -> Dict[str, Any]:
     """
     Submit a quick quote request to get insurance premium estimate.
 
     Args:
-        quote_data: Vehicle and driver information for quote calculation
+        quote_data: Vehicle and driver information for quote calculation, as a dict
+            or a request model (serialized without an intermediate dict)
+        client: Shared Pineapple HTTP client (``app.state.pineapple_client``),
+            so quotes reuse pooled keep-alive connections
 
     Returns:
         API response with premium and excess information
     """
-    # Ensure source is set
-    if "source" not in quote_data:
-        quote_data["source"] = PINEAPPLE_SOURCE_NAME
-
-    url = f"{PINEAPPLE_API_URL}{PINEAPPLE_QUICK_QUOTE_ENDPOINT}"
-
-    logger.debug(f"Quick quote data: {quote_data}")
+    body = _encode_body(quote_data)
+    if logger.isEnabledFor(logging.DEBUG):  # Skip formatting the payload otherwise
+        logger.debug(f"Quick quote data: {quote_data}")
 
     try:
-        logger.info(f"Sending quick quote request to Pineapple API: {url}")
-        headers = _get_headers()
-        logger.debug(f"Using headers: {headers}")
-
-        response = requests.post(url, headers=headers, json=quote_data)
+        logger.info(
+            f"Sending quick quote request to Pineapple API: {PINEAPPLE_API_URL}{PINEAPPLE_QUICK_QUOTE_ENDPOINT}"
+        )
+        # Auth headers are the client's defaults (PINEAPPLE_HEADERS)
+        response = await client.post(PINEAPPLE_QUICK_QUOTE_ENDPOINT, content=body)
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return orjson.loads(response.content)
+    except (httpx.HTTPError, orjson.JSONDecodeError) as e:
         logger.error(f"Error getting quick quote from Pineapple: {str(e)}")
-        if hasattr(e, "response") and e.response:
+        if isinstance(e, httpx.HTTPStatusError):
             logger.error(f"Response: {e.response.text}")
-        raise
+        raise PineappleAPIError(f"Error getting quick quote from Pineapple: {e}") from e
 
 
-def transfer_lead(lead_data: Dict[str, Any]) -> Dict[str, Any]:
+async def transfer_lead(
+    lead_data: Union[Dict[str, Any], BaseModel], client: httpx.AsyncClient
+) -> Dict[str, Any]:
     """
     Transfer a lead to Pineapple's system.
 
     Args:
-        lead_data: Lead information containing contact details
+        lead_data: Lead information containing contact details, as a dict or a
+            request model (serialized without an intermediate dict)
+        client: Shared Pineapple HTTP client (``app.state.pineapple_client``),
+            so transfers reuse pooled keep-alive connections
 
     Returns:
         API response with success status and redirect URL
     """
-    # Ensure source is set
-    if "source" not in lead_data:
-        lead_data["source"] = PINEAPPLE_SOURCE_NAME
-
-    url = f"{PINEAPPLE_API_URL}{PINEAPPLE_LEAD_TRANSFER_ENDPOINT}"
-
-    logger.debug(f"Lead transfer data: {lead_data}")
+    body = _encode_body(lead_data)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Lead transfer data: {lead_data}")
 
     try:
-        logger.info(f"Sending lead transfer request to Pineapple API: {url}")
-        headers = _get_headers()
-        logger.debug(f"Using headers: {headers}")
-
-        response = requests.post(url, headers=headers, json=lead_data)
+        logger.info(
+            f"Sending lead transfer request to Pineapple API: {PINEAPPLE_API_URL}{PINEAPPLE_LEAD_TRANSFER_ENDPOINT}"
+        )
+        # Auth headers are the client's defaults (PINEAPPLE_HEADERS)
+        response = await client.post(PINEAPPLE_LEAD_TRANSFER_ENDPOINT, content=body)
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return orjson.loads(response.content)
+    except (httpx.HTTPError, orjson.JSONDecodeError) as e:
         logger.error(f"Error transferring lead to Pineapple: {str(e)}")
-        if hasattr(e, "response") and e.response:
+        if isinstance(e, httpx.HTTPStatusError):
             logger.error(f"Response: {e.response.text}")
-        raise
+        raise PineappleAPIError(f"Error transferring lead to Pineapple: {e}") from e
 
 
 # Add PineappleAPIService class that was referenced but missing
 class PineappleAPIService:
-    """Service class for Pineapple API interactions."""
+    """
+    Service class for Pineapple API interactions.
+
+    Created once in the app lifespan (``app.state.pineapple_service``) around the
+    shared HTTP client, so requests never construct a service or a connection pool.
+    """
 
-    def __init__(self):
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
         self.base_url = PINEAPPLE_API_URL
-        self.headers = _get_headers()
+        self.headers = PINEAPPLE_HEADERS
         self.source = PINEAPPLE_SOURCE_NAME
 
-    def submit_quick_quote(self, quote_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def submit_quick_quote(
+        self, quote_data: Union[Dict[str, Any], BaseModel]
+    ) -> Dict[str, Any]:
         """Wrapper for quick quote functionality."""
-        return get_quick_quote(quote_data)
+        return await get_quick_quote(quote_data, self.client)
 
-    def transfer_lead(self, lead_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def transfer_lead(
+        self, lead_data: Union[Dict[str, Any], BaseModel]
+    ) -> Dict[str, Any]:
         """Wrapper for lead transfer functionality."""
-        return transfer_lead(lead_data)
+        return await transfer_lead(lead_data, self.client)
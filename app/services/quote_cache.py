@@ -0,0 +1,47 @@
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+import orjson
+from cachetools import TTLCache
+
+from app.schemas import quote as quote_schema
+
+logger = logging.getLogger(__name__)
+
+QUOTE_CACHE_TTL_SECONDS = 60
+QUOTE_CACHE_MAX_ENTRIES = 2048
+QUOTE_CACHE_STALE_TTL_SECONDS = 3600
+
+# Successful quick quotes keyed by (user, canonical request) hash. Identical
+# re-submissions within the TTL are answered without calling Pineapple again.
+_quote_cache: TTLCache = TTLCache(
+    maxsize=QUOTE_CACHE_MAX_ENTRIES, ttl=QUOTE_CACHE_TTL_SECONDS
+)
+# Same entries kept for longer, only served when Pineapple is failing
+_stale_quote_cache: TTLCache = TTLCache(
+    maxsize=QUOTE_CACHE_MAX_ENTRIES, ttl=QUOTE_CACHE_STALE_TTL_SECONDS
+)
+
+
+def quote_cache_key(user_id: str, quote_data: Dict[str, Any]) -> str:
+    """Hashes the user ID and a canonical (key-sorted) JSON form of the request."""
+    canonical = orjson.dumps(quote_data, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(user_id.encode() + b"\0" + canonical).hexdigest()
+
+
+def get_cached_quote(key: str) -> Optional[quote_schema.QuoteResponse]:
+    cached = _quote_cache.get(key)
+    logger.debug(
+        f"Quote cache {'hit' if cached is not None else 'miss'} for {key[:12]}"
+    )
+    return cached
+
+
+def get_stale_quote(key: str) -> Optional[quote_schema.QuoteResponse]:
+    return _stale_quote_cache.get(key)
+
+
+def cache_quote(key: str, response: quote_schema.QuoteResponse) -> None:
+    _quote_cache[key] = response
+    _stale_quote_cache[key] = response
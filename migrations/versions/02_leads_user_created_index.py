@@ -0,0 +1,32 @@
+"""Index leads by user and creation time
+
+Revision ID: 02_leads_user_created_index
+Revises: 01_initial_tables
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "02_leads_user_created_index"
+down_revision: Union[str, None] = "01_initial_tables"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves the per-user lead listing (WHERE user_id = ? ORDER BY created_at DESC)
+    # from the index instead of filtering and sorting the whole table
+    op.create_index(
+        "ix_leads_user_id_created_at",
+        "leads",
+        ["user_id", sa.text("created_at DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_leads_user_id_created_at", table_name="leads")
@@ -0,0 +1,39 @@
+"""Extend the leads listing index with id for keyset pagination
+
+Revision ID: 03_leads_keyset_index
+Revises: 02_leads_user_created_index
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "03_leads_keyset_index"
+down_revision: Union[str, None] = "02_leads_user_created_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The lead listing orders by (created_at DESC, id DESC) and seeks past a
+    # (created_at, id) cursor; with id in the index both the ordering and the seek
+    # are served by one index range scan. It supersedes the (user_id, created_at) index.
+    op.create_index(
+        "ix_leads_user_id_created_at_id",
+        "leads",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.drop_index("ix_leads_user_id_created_at", table_name="leads")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_leads_user_id_created_at",
+        "leads",
+        ["user_id", sa.text("created_at DESC")],
+    )
+    op.drop_index("ix_leads_user_id_created_at_id", table_name="leads")
@@ -0,0 +1,10 @@
+import os
+
+# Settings are read at import time; the tests never reach a real Supabase project
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# The endpoint modules import `limiter` from app.main, so the app has to be imported
+# before any of them is imported on its own
+import app.main  # noqa: E402,F401
@@ -0,0 +1,49 @@
+import base64
+import uuid
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints.leads import _decode_page_cursor, _encode_page_cursor
+
+
+def _raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(value)).decode()
+
+
+def test_round_trips_a_valid_cursor():
+    created_at = datetime(2026, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc)
+    lead_id = uuid.uuid4()
+    token = _encode_page_cursor((created_at.isoformat(), str(lead_id)))
+
+    assert _decode_page_cursor(token) == (created_at, lead_id)
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "not base64!",
+        base64.urlsafe_b64encode(b"not json").decode(),
+        _raw_cursor({"created_at": "2026-01-02T03:04:05+00:00"}),
+        _raw_cursor(["2026-01-02T03:04:05+00:00"]),
+        _raw_cursor(["2026-01-02T03:04:05+00:00", str(uuid.uuid4()), "extra"]),
+        _raw_cursor([1767323045, str(uuid.uuid4())]),
+        _raw_cursor(["yesterday", str(uuid.uuid4())]),
+        _raw_cursor(["2026-01-02T03:04:05+00:00", "not-a-uuid"]),
+        _raw_cursor(["2026-01-02T03:04:05+00:00,id.gt.0", str(uuid.uuid4())]),
+    ],
+)
+def test_rejects_malformed_cursors(token):
+    with pytest.raises(HTTPException) as exc_info:
+        _decode_page_cursor(token)
+    assert exc_info.value.status_code == 400
+
+
+def test_rejects_naive_timestamps():
+    token = _raw_cursor(["2026-01-02T03:04:05", str(uuid.uuid4())])
+
+    with pytest.raises(HTTPException) as exc_info:
+        _decode_page_cursor(token)
+    assert exc_info.value.status_code == 400
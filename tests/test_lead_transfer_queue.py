@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from app.services import lead_transfer_queue
+from app.services.lead_transfer_queue import LeadTransferJob, LeadTransferQueue
+
+TRANSFER_OK = {
+    "success": True,
+    "data": {"uuid": "pineapple-lead-1", "redirect_url": "https://example.test/r"},
+}
+
+
+@pytest.fixture
+def updates(monkeypatch):
+    """Records (local lead ID, status, error) for every stored transfer outcome."""
+    stored = []
+
+    def fake_update_lead_record(db, *, local_lead_id, lead_update_data):
+        stored.append(
+            (local_lead_id, lead_update_data.status, lead_update_data.error_message)
+        )
+        return {"id": local_lead_id}
+
+    monkeypatch.setattr(
+        lead_transfer_queue.crud_lead, "update_lead_record", fake_update_lead_record
+    )
+    monkeypatch.setattr(lead_transfer_queue, "get_supabase_client", lambda: None)
+    monkeypatch.setattr(lead_transfer_queue, "RETRY_BACKOFF_SECONDS", 0.01)
+    return stored
+
+
+def _fake_transfer(monkeypatch, outcomes):
+    """Makes transfer_lead return (or raise) the next outcome queued for each lead."""
+    attempts = {}
+
+    async def fake_transfer_lead(payload, client):
+        lead_id = payload["lead"]
+        attempts[lead_id] = attempts.get(lead_id, 0) + 1
+        outcome = outcomes[lead_id].pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(lead_transfer_queue, "transfer_lead", fake_transfer_lead)
+    return attempts
+
+
+async def _wait_for(condition, timeout=2.0):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.005)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+def test_failed_transfer_is_retried_until_it_succeeds(monkeypatch, updates):
+    attempts = _fake_transfer(
+        monkeypatch,
+        {"lead-1": [RuntimeError("down"), RuntimeError("down"), TRANSFER_OK]},
+    )
+
+    async def run():
+        queue = LeadTransferQueue(client=None, workers=1, max_attempts=3)
+        queue.start()
+        queue.submit(
+            LeadTransferJob(local_lead_id="lead-1", payload={"lead": "lead-1"})
+        )
+        await _wait_for(lambda: updates)
+        await queue.stop()
+
+    asyncio.run(run())
+
+    assert attempts == {"lead-1": 3}
+    assert updates == [("lead-1", "transferred", None)]
+
+
+def test_exhausted_retries_mark_the_record_failed(monkeypatch, updates):
+    attempts = _fake_transfer(monkeypatch, {"lead-1": [RuntimeError("down")] * 3})
+
+    async def run():
+        queue = LeadTransferQueue(client=None, workers=1, max_attempts=3)
+        queue.start()
+        queue.submit(
+            LeadTransferJob(local_lead_id="lead-1", payload={"lead": "lead-1"})
+        )
+        await _wait_for(lambda: updates)
+        await queue.stop()
+
+    asyncio.run(run())
+
+    assert attempts == {"lead-1": 3}
+    assert updates == [("lead-1", "failed_transfer", "down")]
+
+
+def test_retry_backoff_does_not_hold_a_worker(monkeypatch, updates):
+    monkeypatch.setattr(lead_transfer_queue, "RETRY_BACKOFF_SECONDS", 60.0)
+    _fake_transfer(
+        monkeypatch,
+        {"lead-1": [RuntimeError("down")], "lead-2": [TRANSFER_OK]},
+    )
+
+    async def run():
+        queue = LeadTransferQueue(client=None, workers=1, batch_size=1)
+        queue.start()
+        queue.submit(
+            LeadTransferJob(local_lead_id="lead-1", payload={"lead": "lead-1"})
+        )
+        queue.submit(
+            LeadTransferJob(local_lead_id="lead-2", payload={"lead": "lead-2"})
+        )
+        await _wait_for(lambda: updates)
+        await queue.stop()
+
+    asyncio.run(run())
+
+    # lead-2 was sent while lead-1 waited out its backoff, and lead-1 was settled on
+    # shutdown instead of being left pending
+    assert updates == [
+        ("lead-2", "transferred", None),
+        ("lead-1", "failed_transfer", "Transfer interrupted by server shutdown."),
+    ]
+
+
+def test_submit_raises_when_the_queue_is_full(updates):
+    async def run():
+        queue = LeadTransferQueue(client=None, max_queued=1)
+        queue.submit(
+            LeadTransferJob(local_lead_id="lead-1", payload={"lead": "lead-1"})
+        )
+        assert queue.full()
+        with pytest.raises(asyncio.QueueFull):
+            queue.submit(
+                LeadTransferJob(local_lead_id="lead-2", payload={"lead": "lead-2"})
+            )
+        await queue.stop()
+
+    asyncio.run(run())
+
+    # Only the accepted job is settled when the never-started queue shuts down
+    assert updates == [
+        ("lead-1", "failed_transfer", "Transfer interrupted by server shutdown.")
+    ]
@@ -0,0 +1,116 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.api import deps
+from app.api.v1.endpoints import quotes
+from app.main import app, limiter
+from app.schemas import user as user_schema
+from app.services import quote_cache
+
+VEHICLE = {
+    "year": 2018,
+    "make": "VW",
+    "model": "Polo",
+    "modified": "N",
+    "category": "HB",
+    "colour": "White",
+    "financed": "N",
+    "owner": "Y",
+    "status": "SecondHand",
+    "partyIsRegularDriver": "Y",
+    "accessories": "N",
+    "retailValue": 150000,
+    "insuredValueType": "Retail",
+    "useType": "Private",
+    "overnightParkingSituation": "Garage",
+    "coverCode": "Comprehensive",
+    "address": {"addressLine": "1 Main", "postalCode": 2000, "suburb": "X"},
+    "regularDriver": {
+        "maritalStatus": "Single",
+        "currentlyInsured": True,
+        "yearsWithoutClaims": 0,
+        "relationToPolicyHolder": "Self",
+        "dateOfBirth": "1990-01-01",
+    },
+}
+
+
+@pytest.fixture
+def pineapple(monkeypatch):
+    """Replaces Pineapple and the quote table; records every call made to them."""
+    calls = {"quotes": 0, "inserts": [], "updates": []}
+    release = asyncio.Event()
+
+    async def fake_get_quick_quote(request, client):
+        calls["quotes"] += 1
+        await release.wait()
+        return {
+            "success": True,
+            "id": "pq-1",
+            "data": [{"premium": 100.0, "excess": 5.0}],
+        }
+
+    monkeypatch.setattr(quotes, "get_quick_quote", fake_get_quick_quote)
+    monkeypatch.setattr(
+        quotes.crud_quote,
+        "create_quote_record",
+        lambda db, quote_in: calls["inserts"].append(quote_in) or quote_in,
+    )
+    monkeypatch.setattr(
+        quotes.crud_quote,
+        "update_quote_record",
+        lambda db, local_quote_id, quote_update_data: calls["updates"].append(
+            quote_update_data.status
+        )
+        or {"id": local_quote_id},
+    )
+    monkeypatch.setattr(limiter, "enabled", False)
+    user = user_schema.User.model_validate(
+        {
+            "id": "user-1",
+            "aud": "authenticated",
+            "app_metadata": {},
+            "user_metadata": {},
+        }
+    )
+    app.dependency_overrides[deps.get_current_user] = lambda: user
+    app.dependency_overrides[deps.get_db] = lambda: None
+    app.dependency_overrides[deps.get_pineapple_client] = lambda: None
+    quote_cache._quote_cache.clear()
+    yield calls, release
+    app.dependency_overrides.clear()
+    quote_cache._quote_cache.clear()
+
+
+def test_concurrent_identical_quotes_share_one_pineapple_call(pineapple):
+    calls, release = pineapple
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://t"
+        ) as client:
+            requests = [
+                asyncio.create_task(
+                    client.post("/api/v1/quotes/quick", json={"vehicles": [VEHICLE]})
+                )
+                for _ in range(5)
+            ]
+            while calls["quotes"] == 0:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)  # Let every request join the in-flight quote
+            release.set()
+            responses = await asyncio.gather(*requests)
+            await asyncio.gather(*quotes._record_update_tasks)
+            return responses
+
+    responses = asyncio.run(run())
+
+    assert [r.status_code for r in responses] == [201] * 5
+    assert calls["quotes"] == 1
+    assert len(calls["inserts"]) == 1
+    assert calls["updates"] == ["success"]
+    assert len({r.json()["local_quote_reference_id"] for r in responses}) == 1
+    assert quotes._inflight_quotes == {}